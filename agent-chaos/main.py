@@ -5,12 +5,15 @@ import subprocess
 import signal
 from src.utils.scraper import run_scraper
 from src.agents.agent import Agent
+from src.agents.runtime import run_agents
 from src.communication.agora import Agora
 from src.utils.config import config
 from src.bridge.discord import DiscordBridge
 from src.utils.monitor import run_monitor
 from src.utils.service_monitor import run_service_monitor
 from src.utils.interact import run_interrogator
+from src.utils.benchmark import run_benchmark
+from src.utils.llm_stub import run_llm_stub
 
 
 async def service_report_loop(agora: Agora, discord_bridge: DiscordBridge):
@@ -32,7 +35,10 @@ async def start_single_agent(user_id: int):
     await discord_bridge.start()
 
     agent = Agent(user_id, agora, discord_bridge)
-    await agent.run()
+    try:
+        await agent.run()
+    finally:
+        await agora.close()
 
 
 async def start_agents_orchestrator():
@@ -57,13 +63,21 @@ async def start_agents_orchestrator():
 
     if not active_user_ids:
         print("No agent logs found. Run 'scrape' first.")
+        await agora.close()
         return
 
     # Start report loop and monitor
-    await asyncio.gather(service_report_loop(agora, discord_bridge), run_monitor())
+    try:
+        await asyncio.gather(service_report_loop(agora, discord_bridge), run_monitor())
+    finally:
+        await agora.close()
 
 
 def spawn_background_agents():
+    if config.AGENT_RUNTIME == "shared":
+        spawn_shared_runtimes()
+        return
+
     log_files = os.listdir("data/logs") if os.path.exists("data/logs") else []
     for filename in log_files:
         if filename.endswith(".json"):
@@ -78,23 +92,77 @@ def spawn_background_agents():
                 )
 
 
+def discover_user_ids() -> list[int]:
+    log_files = os.listdir("data/logs") if os.path.exists("data/logs") else []
+    user_ids = []
+    for filename in log_files:
+        if filename.endswith(".json"):
+            try:
+                user_id = int(filename.split(".")[0])
+            except ValueError:
+                continue
+            if user_id in config.ALLOWED_USER_IDS:
+                user_ids.append(user_id)
+    return sorted(user_ids)
+
+
+def spawn_shared_runtimes():
+    # Shards agents across AGENT_WORKERS processes, each hosting its share of
+    # agents as asyncio tasks
+    user_ids = discover_user_ids()
+    workers = max(1, min(config.AGENT_WORKERS, len(user_ids)))
+    for worker in range(workers):
+        shard = user_ids[worker::workers]
+        if not shard:
+            continue
+        print(
+            f"Spawning shared runtime {worker} for {len(shard)} agents in background..."
+        )
+        subprocess.Popen(
+            [sys.executable, "main.py", "swarm", ",".join(str(uid) for uid in shard)],
+            stdout=open(f"data/state/runtime_{worker}.log", "a"),
+            stderr=subprocess.STDOUT,
+            preexec_fn=os.setpgrp,
+        )
+
+
 async def stop_all_agents():
     agora = Agora()
     await agora.initialize()
     registry = await agora.get_registry()
+    # Agents in a shared runtime share a PID; signal each process once
+    signaled = set()
     for entry in registry:
         if entry.status == "active":
             print(f"Stopping agent {entry.agent_id} (PID {entry.pid})...")
+            if entry.pid in signaled:
+                continue
+            signaled.add(entry.pid)
             try:
                 os.kill(entry.pid, signal.SIGTERM)
             except ProcessLookupError:
                 print(f"Process {entry.pid} already gone.")
+    await agora.close()
     print("All active agents signaled to stop.")
 
 
+async def archive_agora(older_than_days: int):
+    agora = Agora()
+    await agora.initialize()
+    try:
+        moved = await agora.archive(older_than_days)
+    finally:
+        await agora.close()
+    print(
+        f"Archived {moved} Agora rows older than {older_than_days} days to {config.AGORA_ARCHIVE_DIR}."
+    )
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python main.py [scrape|run|services|interact|stop|agent <uid>]")
+        print(
+            "Usage: python main.py [scrape|run|services|interact|stop|agent <uid>|swarm [uid,...]|archive [days]|bench [pool|decode|contention [agents] [seconds]]|stub [port]]"
+        )
         return
 
     mode = sys.argv[1]
@@ -111,12 +179,27 @@ def main():
     elif mode == "agent":
         user_id = int(sys.argv[2])
         asyncio.run(start_single_agent(user_id))
+    elif mode == "swarm":
+        if len(sys.argv) > 2:
+            user_ids = [int(uid) for uid in sys.argv[2].split(",") if uid]
+        else:
+            user_ids = discover_user_ids()
+        asyncio.run(run_agents(user_ids))
     elif mode == "services":
         asyncio.run(run_service_monitor())
     elif mode == "interact":
         asyncio.run(run_interrogator())
     elif mode == "stop":
         asyncio.run(stop_all_agents())
+    elif mode == "archive":
+        days = int(sys.argv[2]) if len(sys.argv) > 2 else config.AGORA_RETENTION_DAYS
+        asyncio.run(archive_agora(days))
+    elif mode == "bench":
+        kind = sys.argv[2] if len(sys.argv) > 2 else "pool"
+        asyncio.run(run_benchmark(kind, *sys.argv[3:]))
+    elif mode == "stub":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else config.LLM_STUB_PORT
+        run_llm_stub(port)
     else:
         print(f"Unknown mode: {mode}")
 
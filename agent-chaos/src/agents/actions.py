@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+from ..bridge.ssh import SSHExecutor
+from ..utils.config import config
+
+# One semaphore per VM for the whole process, so agents sharing a runtime also
+# share the cap on concurrent commands against each VM
+_vm_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def _vm_slot(vm_ip: str) -> asyncio.Semaphore:
+    if vm_ip not in _vm_slots:
+        _vm_slots[vm_ip] = asyncio.Semaphore(config.ACTION_MAX_PER_VM)
+    return _vm_slots[vm_ip]
+
+
+class ActionResult(NamedTuple):
+    vm_ip: str
+    command: str
+    status: int
+    stdout: str
+    stderr: str
+    duration: float
+
+
+class ActionExecutor:
+    # Runs a tick's actions: commands for the same VM keep their order, commands
+    # for different VMs run concurrently, and each one has a wall-clock timeout
+    def __init__(
+        self,
+        executors: Dict[str, SSHExecutor],
+        timeout: float = config.ACTION_TIMEOUT,
+    ):
+        self.executors = executors
+        self.timeout = timeout
+        self._cancel = threading.Event()
+        self.start()
+
+    def cancel(self):
+        # Abandons every running command; safe to call from a signal handler
+        self._cancel.set()
+
+    def start(
+        self,
+        on_result: Optional[Callable[[ActionResult], Awaitable[None]]] = None,
+        on_progress: Optional[Callable[[str, str, str], Awaitable[None]]] = None,
+    ):
+        # Begins a batch; actions are then submitted one by one as they arrive.
+        # on_progress(vm_ip, command, output) gets partial output of long commands.
+        self._cancel.clear()
+        self._chains: Dict[str, asyncio.Task] = {}
+        self._results: List[ActionResult] = []
+        self._on_result = on_result
+        self._on_progress = on_progress
+
+    def submit(self, action: dict) -> bool:
+        vm_ip = action.get("vm_ip")
+        command = action.get("command")
+        if vm_ip not in self.executors or not command:
+            return False
+        # Chain behind the previous command for the same VM to keep their order
+        self._chains[vm_ip] = asyncio.create_task(
+            self._run_after(self._chains.get(vm_ip), vm_ip, command)
+        )
+        return True
+
+    async def wait(self) -> List[ActionResult]:
+        if self._chains:
+            await asyncio.gather(*self._chains.values())
+        return self._results
+
+    async def _run_after(
+        self, previous: Optional[asyncio.Task], vm_ip: str, command: str
+    ):
+        if previous is not None:
+            await previous
+        if self._cancel.is_set():
+            return
+        result = await self._execute(vm_ip, command)
+        self._results.append(result)
+        if self._on_result is not None:
+            try:
+                await self._on_result(result)
+            except Exception as e:
+                print(f"Failed to report result of '{command}' on {vm_ip}: {e}")
+
+    async def _report_progress(self, vm_ip: str, command: str, output: str):
+        try:
+            await self._on_progress(vm_ip, command, output)
+        except Exception as e:
+            print(f"Failed to report progress of '{command}' on {vm_ip}: {e}")
+
+    async def _execute(self, vm_ip: str, command: str) -> ActionResult:
+        executor = self.executors[vm_ip]
+        on_progress = None
+        if self._on_progress is not None:
+            loop = asyncio.get_running_loop()
+
+            def on_progress(output: str):
+                # Called from the SSH worker thread
+                asyncio.run_coroutine_threadsafe(
+                    self._report_progress(vm_ip, command, output), loop
+                )
+
+        async with _vm_slot(vm_ip):
+            start = time.monotonic()
+            try:
+                status, stdout, stderr = await asyncio.to_thread(
+                    executor.execute, command, self.timeout, self._cancel, on_progress
+                )
+            except Exception as e:
+                status, stdout, stderr = -1, "", f"SSH error: {e}"
+            return ActionResult(
+                vm_ip, command, status, stdout, stderr, time.monotonic() - start
+            )
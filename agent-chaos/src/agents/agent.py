@@ -1,255 +1,607 @@
 import os
 import signal
 import asyncio
+import contextlib
 import json
 import time
+from collections import deque
+from typing import AsyncIterator, Dict, Optional
+from ..agents.actions import ActionExecutor, ActionResult
 from ..agents.brain import Brain
-from ..agents.personality import Personality
-from ..communication.agora import Agora, ServiceInfo
+from ..agents.budget import BudgetStatus, TokenBudget
+from ..agents.context import ContextBuilder, estimate_prompt
+from ..agents.memory import Memory
+from ..agents.personality import Personality, persona_usable
+from ..agents.router import Route
+from ..agents.scheduler import TickScheduler
+from ..agents.stream_parser import StreamingJSONParser
+from ..communication.agora import Agora, AgentCheckpoint, ServiceInfo
+from ..communication.status import StatusBoard
 from ..bridge.ssh import SSHExecutor
 from ..bridge.discord import DiscordBridge
 from ..utils.config import config
 from ..utils.logger import agent_logger
 
+# Response fields only acted on once the whole response has parsed
+HELD_KEYS = ("message", "discord_update")
+
 
 class Agent:
-    def __init__(self, user_id: int, agora: Agora, discord_bridge: DiscordBridge):
+    def __init__(
+        self,
+        user_id: int,
+        agora: Agora,
+        discord_bridge: DiscordBridge,
+        brain: Optional[Brain] = None,
+        executors: Optional[Dict[str, SSHExecutor]] = None,
+    ):
         self.user_id = str(user_id)
         self.username = str(user_id)
         self.avatar_url = None
         self.agora = agora
         self.discord_bridge = discord_bridge
-        self.brain = Brain()
+        self.brain = brain or Brain()
         self.personality = Personality(user_id)
-        self.executors = {ip: SSHExecutor(ip) for ip in config.VM_IPS}
-        self.history = []
+        self.executors = (
+            executors
+            if executors is not None
+            else {ip: SSHExecutor(ip) for ip in config.VM_IPS}
+        )
+        self.action_executor = ActionExecutor(self.executors)
+        self.status_board = StatusBoard()
         # Generate a consistent color based on user_id
         self.color = int(abs(hash(self.user_id)) % 0xFFFFFF)
         self.last_discord_update = 0
-        self.last_query_id = 0
+        # Rolling window of recent Agora rows, advanced incrementally from a
+        # cursor that is persisted in the Agora so restarts resume in place
+        self.feed_window: deque = deque(maxlen=config.AGENT_FEED_WINDOW)
+        self.feed_cursor = 0
         self.stop_requested = False
+        self.last_checkpoint = 0.0
+        self.scheduler = TickScheduler()
+        self.context_builder = ContextBuilder(f"chaos-{self.username}")
+        self.budget = TokenBudget(agora, f"chaos-{self.username}")
+        self.budget_paused = False
+        # Older turns are summarized by a cheaper model, recent ones kept verbatim
+        self.memory = Memory(agora, self.brain, f"chaos-{self.username}")
 
     def handle_stop(self, signum, frame):
         self.stop_requested = True
+        self.action_executor.cancel()
+        self.scheduler.wake_threadsafe("stop")
+        # Make sure anything buffered by write-behind batching hits the disk
+        self.agora.request_flush()
+
+    def write_status(self, status: str):
+        try:
+            self.status_board.write(
+                self.agent_label,
+                pid=os.getpid(),
+                status=status,
+                total_tokens=self.brain.total_tokens,
+                last_context_tokens=self.brain.last_context_tokens,
+                context_tokens=self.context_builder.section_tokens,
+                budget=self.budget.status.to_dict() if self.budget.status else None,
+                routing=self.brain.router.stats(),
+                **self.scheduler.stats(),
+            )
+        except OSError as e:
+            print(f"Agent {self.agent_label} failed to write status file: {e}")
+
+    async def restore(self) -> bool:
+        # Resumes identity, persona, counters and pacing from the last
+        # checkpoint instead of asking Discord and regenerating the persona
+        checkpoint = await self.agora.get_checkpoint(self.user_id)
+        if checkpoint is None or not persona_usable(checkpoint.persona):
+            return False
+        self.username = checkpoint.username
+        self.avatar_url = checkpoint.avatar_url
+        self.personality.persona_profile = checkpoint.persona
+        self.last_discord_update = checkpoint.last_discord_update
+        self.brain.total_tokens = checkpoint.total_tokens
+        self.brain.last_context_tokens = checkpoint.last_context_tokens
+        if checkpoint.tick_interval:
+            self.scheduler.interval = checkpoint.tick_interval
+        return True
+
+    async def checkpoint(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self.last_checkpoint < config.AGENT_CHECKPOINT_INTERVAL:
+            return
+        self.last_checkpoint = now
+        await self.agora.save_checkpoint(
+            AgentCheckpoint(
+                user_id=self.user_id,
+                agent_label=self.agent_label,
+                username=self.username,
+                avatar_url=self.avatar_url,
+                # A stand-in persona is not saved, so a restart regenerates it
+                persona=(
+                    ""
+                    if self.personality.persona_pending
+                    else self.personality.persona_profile
+                ),
+                last_discord_update=self.last_discord_update,
+                total_tokens=self.brain.total_tokens,
+                last_context_tokens=self.brain.last_context_tokens,
+                tick_interval=self.scheduler.interval,
+            )
+        )
+
+    async def load_feed(self):
+        cursor = await self.agora.get_cursor(self.agent_label)
+        if cursor is None:
+            # First run: start from the present instead of replaying history
+            recent = await self.agora.get_recent_records(limit=config.AGENT_FEED_WINDOW)
+            if recent and recent[-1].id is not None:
+                self.feed_cursor = recent[-1].id
+        else:
+            recent = await self.agora.get_recent_records(
+                limit=config.AGENT_FEED_WINDOW, up_to_id=cursor
+            )
+            self.feed_cursor = cursor
+        self.feed_window.extend(recent)
+
+    async def read_feed(self) -> list:
+        # Only rows after the cursor are read; paging means nothing is skipped
+        # however many rows arrived since the last tick
+        new_messages = []
+        while True:
+            batch = await self.agora.get_since(self.feed_cursor, limit=200)
+            for msg in batch:
+                if msg.id is not None:
+                    self.feed_cursor = msg.id
+                self.feed_window.append(msg)
+                new_messages.append(msg)
+            if len(batch) < 200:
+                break
+        if new_messages:
+            await self.agora.set_cursor(self.agent_label, self.feed_cursor)
+        return new_messages
+
+    async def post_action_result(self, result: ActionResult):
+        output = f"Command: {result.command}\nStatus: {result.status}\nSTDOUT: {result.stdout}\nSTDERR: {result.stderr}"
+        agent_logger.log(
+            self.agent_label,
+            f"Result of: {result.command}",
+            action=result.command,
+            result=output,
+        )
+        await self.agora.post(
+            self.agent_label,
+            output,
+            "action",
+            metadata={
+                "vm_ip": result.vm_ip,
+                "command": result.command,
+                "duration": round(result.duration, 2),
+            },
+        )
+
+    async def post_action_progress(self, vm_ip: str, command: str, output: str):
+        await self.agora.post(
+            self.agent_label,
+            f"Command (still running): {command}\nLatest output: {output}",
+            "action_progress",
+            metadata={"vm_ip": vm_ip, "command": command},
+        )
+
+    def estimate_call(self, system_prompt: str, context_message: dict) -> int:
+        return (
+            estimate_prompt(system_prompt, [*self.memory.messages(), context_message])
+            + config.LLM_COMPLETION_ESTIMATE
+        )
+
+    def apply_budget_pacing(self, level: str):
+        # Near the limit, tick less often; when paused, check back rarely
+        if level == "pause":
+            self.scheduler.set_floor(self.scheduler.max_interval)
+        elif level == "slow":
+            self.scheduler.set_floor(self.scheduler.base_interval * 4)
+        else:
+            self.scheduler.set_floor(0.0)
+
+    def route_tick(
+        self, new_activity: list, user_queries: list, budget_level: str
+    ) -> Route:
+        others = [msg for msg in new_activity if msg.agent_id != self.agent_label]
+        return self.brain.router.route(
+            "tick",
+            queries=len(user_queries),
+            mentions=sum(
+                1
+                for msg in others
+                if msg.type == "message" and self.agent_label in msg.content
+            ),
+            # Our own command results landed since the last tick
+            action_results=sum(
+                1
+                for msg in new_activity
+                if msg.agent_id == self.agent_label
+                and msg.type in ("action", "action_progress")
+            ),
+            others_rows=len(others),
+            budget_level=budget_level,
+        )
+
+    async def respond(
+        self,
+        system_prompt: str,
+        context_message: dict,
+        user_queries: list,
+        route: Route,
+    ) -> tuple:
+        # A fast-model answer is only acted on once it has parsed completely,
+        # so an invalid one can be retried on the strong model without posting
+        # or running anything twice
+        if route.tier != "fast":
+            return await self._respond(
+                system_prompt, context_message, user_queries, route, defer=False
+            )
+        try:
+            return await self._respond(
+                system_prompt, context_message, user_queries, route, defer=True
+            )
+        except json.JSONDecodeError as e:
+            route = self.brain.router.escalate(route, "invalid JSON")
+            print(
+                f"Agent {self.agent_label} escalating to {route.model}: fast model returned invalid JSON ({e.msg})"
+            )
+        return await self._respond(
+            system_prompt, context_message, user_queries, route, defer=False
+        )
+
+    async def _respond(
+        self,
+        system_prompt: str,
+        context_message: dict,
+        user_queries: list,
+        route: Route,
+        defer: bool,
+    ) -> tuple:
+        # Streams the completion and acts on each element of the response as
+        # soon as it parses: thoughts go out and commands start while the model
+        # is still writing the rest. Messages and Discord updates wait for the
+        # whole object, since a response that then fails to parse leaves its
+        # queries pending and would answer the operator twice.
+        parser = StreamingJSONParser()
+        deferred = []
+        # Stable content first (system prompt, then memory), the changing Agora
+        # context last, so consecutive ticks share the longest possible prefix
+        messages = [*self.memory.messages(), context_message]
+        self.action_executor.start(self.post_action_result, self.post_action_progress)
+        try:
+            # Closing the completion on a parse error settles the call's usage
+            async with contextlib.aclosing(
+                self._completion(system_prompt, messages, route)
+            ) as completion:
+                async for chunk in completion:
+                    for event in parser.feed(chunk):
+                        if defer or event[1] in HELD_KEYS:
+                            deferred.append(event)
+                        else:
+                            await self.dispatch(*event, user_queries)
+            if not parser.done:
+                raise json.JSONDecodeError(
+                    "Response ended before the JSON object was complete",
+                    parser.buffer,
+                    len(parser.buffer),
+                )
+            for event in deferred:
+                await self.dispatch(*event, user_queries)
+        finally:
+            # Results are posted as each command finishes
+            await self.action_executor.wait()
+        return parser.buffer, parser.result
+
+    async def _completion(
+        self, system_prompt: str, messages: list, route: Route
+    ) -> AsyncIterator[str]:
+        if config.AGENT_STREAMING:
+            async with contextlib.aclosing(
+                self.brain.stream(
+                    system_prompt,
+                    messages,
+                    json_mode=config.AGENT_JSON_MODE,
+                    route=route,
+                )
+            ) as stream:
+                async for chunk in stream:
+                    yield chunk
+        else:
+            yield await self.brain.think(
+                system_prompt,
+                messages,
+                json_mode=config.AGENT_JSON_MODE,
+                route=route,
+            )
+
+    async def dispatch(self, kind: str, key: str, value, user_queries: list):
+        is_responding_to_query = len(user_queries) > 0
+        if kind == "item":
+            if key == "actions" and isinstance(value, dict):
+                self.action_executor.submit(value)
+            elif key == "services" and isinstance(value, dict):
+                await self.register_service(value)
+            return
+
+        # Models sometimes send null, a list or an object; only text is posted
+        if not isinstance(value, str) or not value:
+            return
+
+        if key in ("thought", "feeling"):
+            await self.agora.post(self.agent_label, value, key)
+
+        elif key == "message":
+            await self.agora.post(self.agent_label, value, "message")
+            if is_responding_to_query:
+                await self.agora.post(self.agent_label, value, "operator_response")
+                # Log the interaction specifically
+                for q in user_queries:
+                    agent_logger.log_interaction(self.agent_label, q, value)
+
+        elif key == "discord_update":
+            current_time = time.time()
+            # Bypass rate limit if responding to a direct interrogation
+            if is_responding_to_query or (
+                current_time - self.last_discord_update >= 30
+            ):
+                await self.discord_bridge.send_update(
+                    value,
+                    sender_name=f"chaos-{self.username}",
+                    color=self.color,
+                    avatar_url=self.avatar_url,
+                )
+                self.last_discord_update = current_time
+                # Sync to Agora so other agents are aware of the public update
+                await self.agora.post(self.agent_label, value, "discord_update")
+                if is_responding_to_query:
+                    await self.agora.post(self.agent_label, value, "operator_response")
+                    # Log interaction
+                    for q in user_queries:
+                        agent_logger.log_interaction(self.agent_label, q, value)
+            else:
+                # Log internally that we skipped a frequent update
+                print(
+                    f"Agent {self.agent_label} Discord update rate-limited (last update was {current_time - self.last_discord_update:.1f}s ago)"
+                )
+
+    async def register_service(self, svc: dict):
+        service_name = svc.get("service_name")
+        vm_ip = svc.get("vm_ip")
+        description = svc.get("description")
+        if service_name and vm_ip and description:
+            service_info = ServiceInfo(
+                service_name=service_name,
+                vm_ip=vm_ip,
+                agent_id=self.agent_label,
+                description=description,
+            )
+            await self.agora.register_service(service_info)
+            await self.agora.post(
+                self.agent_label,
+                f"Registered service: {service_name} on {vm_ip}",
+                "message",
+            )
+
+    async def watch_agora(self):
+        # Wakes the scheduler as soon as something addressed to this agent lands,
+        # instead of letting it sit until the next timed tick
+        async with self.agora.subscribe(
+            msg_types=["user_query", "command", "message"]
+        ) as feed:
+            async for msg in feed:
+                if msg.agent_id == self.agent_label and msg.type == "message":
+                    continue
+                if msg.type == "user_query" and msg.agent_id in (
+                    "all",
+                    self.agent_label,
+                ):
+                    self.scheduler.wake("query")
+                elif msg.type == "command" and msg.content == "STOP":
+                    if msg.agent_id in ("system", "all", self.agent_label):
+                        self.scheduler.wake("stop")
+                elif msg.type == "message" and self.agent_label in msg.content:
+                    self.scheduler.wake("mention")
+
+    async def act(
+        self,
+        system_prompt: str,
+        context_message: dict,
+        new_activity: list,
+        pending_queries: list,
+        budget: BudgetStatus,
+        others_active: bool,
+    ):
+        user_queries = [q.content for q in pending_queries]
+        is_responding_to_query = len(user_queries) > 0
+        if self.budget_paused and budget.level != "pause":
+            self.budget_paused = False
+            await self.agora.post(
+                self.agent_label,
+                f"Agent {self.agent_label} resumed: token budget at {budget.fraction:.0%}.",
+                "message",
+            )
+        # Fast model for idle ticks, strong one when there is real work
+        route = self.route_tick(new_activity, user_queries, budget.level)
+        try:
+            response_str, response = await self.respond(
+                system_prompt, context_message, user_queries, route
+            )
+        except json.JSONDecodeError as e:
+            print(
+                f"Agent {self.user_id} failed to produce valid JSON ({e.msg}): {e.doc}"
+            )
+            self.scheduler.record_tick(active=True)
+            return
+
+        agent_logger.log(
+            self.agent_label,
+            response.get("thought", ""),
+            action=json.dumps(response.get("actions", [])),
+            result="Dispatched",
+            message=response.get("message"),
+            feeling=response.get("feeling"),
+        )
+
+        # Acknowledge only once the response has been acted on, so a failed
+        # tick leaves the queries pending for the next one
+        await self.agora.ack_queries(self.agent_label, [q.id for q in pending_queries])
 
-    async def run(self):
-        # Setup signal handler for graceful shutdown
-        signal.signal(signal.SIGTERM, self.handle_stop)
+        # Remember the turn; older turns get folded into the summary
+        await self.memory.add_turn("assistant", response_str)
 
-        self.username, self.avatar_url = await self.discord_bridge.get_user_info(
-            int(self.user_id)
+        self.scheduler.record_tick(
+            active=is_responding_to_query
+            or others_active
+            or bool(response.get("actions"))
         )
+
+    async def run(self, install_signal_handler: bool = True):
+        # Setup signal handler for graceful shutdown. A shared runtime installs
+        # its own handler that stops every agent it hosts.
+        if install_signal_handler:
+            signal.signal(signal.SIGTERM, self.handle_stop)
+
+        restored = await self.restore()
+        if not restored:
+            self.username, self.avatar_url = await self.discord_bridge.get_user_info(
+                int(self.user_id)
+            )
         self.agent_label = f"chaos-{self.username}"
+        self.context_builder.agent_label = self.agent_label
+        self.budget.agent_label = self.agent_label
+        self.brain.agent_id = self.agent_label
+        self.brain.on_usage = self.agora.record_usage
 
-        await self.personality.initialize(self.brain)
+        if not restored:
+            await self.personality.initialize(self.brain)
+            # Persist the persona straight away; it is the expensive part
+            if not self.personality.persona_pending:
+                await self.checkpoint(force=True)
+        await asyncio.gather(self.memory.load(self.agent_label), self.load_feed())
         await self.agora.post(
             self.agent_label,
             f"Agent {self.agent_label} initialized and online.",
             "message",
         )
+        await self.agora.update_registry(
+            self.agent_label,
+            os.getpid(),
+            "active",
+            self.brain.total_tokens,
+            self.brain.last_context_tokens,
+        )
+        watcher = asyncio.create_task(self.watch_agora())
 
         while not self.stop_requested:
             try:
-                # Update registry
-                await self.agora.update_registry(
+                # Heartbeat: the status file every tick, the Agora on an interval
+                self.write_status("paused" if self.budget_paused else "active")
+                await self.agora.heartbeat(
                     self.agent_label,
                     os.getpid(),
-                    "active",
                     self.brain.total_tokens,
                     self.brain.last_context_tokens,
                 )
 
                 # 1. Observe the world (Agora)
-                recent_activity = await self.agora.get_recent(limit=50)
-                active_services = await self.agora.get_services()
-
-                context = "Recent Agora Activity:\n"
-                user_queries = []
-                max_query_id = self.last_query_id
+                new_activity = await self.read_feed()
+                # Only other agents' rows count as a change worth thinking about
+                others_active = any(
+                    msg.agent_id != self.agent_label for msg in new_activity
+                )
+                active_services = await self.agora.get_services_records()
 
-                for msg in recent_activity:
+                for msg in new_activity:
                     if msg.type == "command" and msg.content == "STOP":
-                        self.stop_requested = True
-                        break
-
-                    if msg.type == "user_query" and msg.id is not None:
-                        if msg.id > self.last_query_id:
-                            # Only pay attention to queries directed at me or general
-                            if (
-                                msg.agent_id == "all"
-                                or msg.agent_id == self.agent_label
-                            ):
-                                user_queries.append(msg.content)
-                                if msg.id > max_query_id:
-                                    max_query_id = msg.id
-                    context += f"[{msg.timestamp}] {msg.agent_id} ({msg.type}): {msg.content}\n"
+                        # "Stop All" is posted as system; "Stop Agent" targets a label
+                        if msg.agent_id in ("system", "all", self.agent_label):
+                            self.stop_requested = True
+                            break
 
-                is_responding_to_query = len(user_queries) > 0
-                if is_responding_to_query:
-                    self.last_query_id = max_query_id
-                    context += "\nURGENT: The human operator (Gradius) has asked you specifically:\n"
-                    for q in user_queries:
-                        context += f"- {q}\n"
-                    context += "Please address these queries directly in your thoughts and responses.\n"
+                # Operator queries come from our inbox, not the feed window, so
+                # none are missed however busy the Agora is
+                pending_queries = await self.agora.fetch_pending_queries(
+                    self.agent_label
+                )
+                user_queries = [q.content for q in pending_queries]
 
-                if active_services:
-                    context += "\nCurrently Registered Services:\n"
-                    for svc in active_services:
-                        context += f"- {svc.service_name} on {svc.vm_ip} (started by {svc.agent_id}): {svc.description}\n"
+                is_responding_to_query = len(user_queries) > 0
+                # Ranked and trimmed to the token budget: queries first, bulk
+                # command output from other agents last
+                context = self.context_builder.build(
+                    self.feed_window, user_queries, active_services
+                )
 
                 # 2. Think
-                system_prompt = self.personality.get_system_prompt(
-                    context, self.agent_label
-                )
-                response_str = await self.brain.think(system_prompt, self.history[-10:])
-
-                try:
-                    # Parse JSON response
-                    # Sometimes LLMs wrap JSON in code blocks
-                    clean_response = response_str.strip()
-                    if clean_response.startswith("```json"):
-                        clean_response = clean_response[7:-3].strip()
-                    elif clean_response.startswith("```"):
-                        clean_response = clean_response[3:-3].strip()
-
-                    response = json.loads(clean_response)
-                except json.JSONDecodeError:
-                    print(
-                        f"Agent {self.user_id} failed to produce valid JSON: {response_str}"
-                    )
-                    await asyncio.sleep(10)
-                    continue
+                system_prompt = self.personality.get_system_prompt(self.agent_label)
+                context_message = self.personality.get_context_message(context)
 
-                # 3. Act & Communicate
-                agent_logger.log(
-                    self.agent_label,
-                    response.get("thought", ""),
-                    action=json.dumps(response.get("actions", [])),
-                    result="Pending...",
-                    message=response.get("message"),
-                    feeling=response.get("feeling"),
+                # Pre-flight: measure the assembled prompt against the token
+                # budget and shrink the context first if it would run over
+                budget = await self.budget.check(
+                    self.estimate_call(system_prompt, context_message),
+                    self.brain.total_tokens,
                 )
-
-                if "thought" in response:
-                    await self.agora.post(
-                        self.agent_label, response["thought"], "thought"
+                if budget.level != "ok":
+                    self.context_builder.budget = config.AGENT_CONTEXT_BUDGET // (
+                        2 if budget.level == "trim" else 4
                     )
-
-                if "feeling" in response:
-                    await self.agora.post(
-                        self.agent_label, response["feeling"], "feeling"
+                    context = self.context_builder.build(
+                        self.feed_window, user_queries, active_services
                     )
-
-                if "message" in response and response["message"]:
-                    await self.agora.post(
-                        self.agent_label, response["message"], "message"
+                    self.context_builder.budget = config.AGENT_CONTEXT_BUDGET
+                    context_message = self.personality.get_context_message(context)
+                    budget = await self.budget.check(
+                        self.estimate_call(system_prompt, context_message),
+                        self.brain.total_tokens,
                     )
-                    if is_responding_to_query:
-                        await self.agora.post(
-                            self.agent_label,
-                            response["message"],
-                            "operator_response",
-                        )
-                        # Log the interaction specifically
-                        for q in user_queries:
-                            agent_logger.log_interaction(
-                                self.agent_label, q, response["message"]
-                            )
-
-                if "discord_update" in response and response["discord_update"]:
-                    current_time = time.time()
-                    # Bypass rate limit if responding to a direct interrogation
-                    if is_responding_to_query or (
-                        current_time - self.last_discord_update >= 30
-                    ):
-                        await self.discord_bridge.send_update(
-                            response["discord_update"],
-                            sender_name=f"chaos-{self.username}",
-                            color=self.color,
-                            avatar_url=self.avatar_url,
-                        )
-                        self.last_discord_update = current_time
-                        # Sync to Agora so other agents are aware of the public update
+                self.apply_budget_pacing(budget.level)
+                # Paused agents still answer the operator
+                if budget.level == "pause" and not is_responding_to_query:
+                    if not self.budget_paused:
+                        self.budget_paused = True
                         await self.agora.post(
                             self.agent_label,
-                            response["discord_update"],
-                            "discord_update",
+                            f"Agent {self.agent_label} paused: token budget exhausted ({budget.fraction:.0%}).",
+                            "message",
                         )
-                        if is_responding_to_query:
-                            await self.agora.post(
-                                self.agent_label,
-                                response["discord_update"],
-                                "operator_response",
-                            )
-                            # Log interaction
-                            for q in user_queries:
-                                agent_logger.log_interaction(
-                                    self.agent_label, q, response["discord_update"]
-                                )
-                    else:
-                        # Log internally that we skipped a frequent update
-                        print(
-                            f"Agent {self.agent_label} Discord update rate-limited (last update was {current_time - self.last_discord_update:.1f}s ago)"
-                        )
-
-                if "services" in response:
-                    for svc in response["services"]:
-                        service_name = svc.get("service_name")
-                        vm_ip = svc.get("vm_ip")
-                        description = svc.get("description")
-                        if service_name and vm_ip and description:
-                            service_info = ServiceInfo(
-                                service_name=service_name,
-                                vm_ip=vm_ip,
-                                agent_id=self.agent_label,
-                                description=description,
-                            )
-                            await self.agora.register_service(service_info)
-                            await self.agora.post(
-                                self.agent_label,
-                                f"Registered service: {service_name} on {vm_ip}",
-                                "message",
-                            )
-
-                if "actions" in response:
-                    for action in response["actions"]:
-                        vm_ip = action.get("vm_ip")
-                        command = action.get("command")
-                        if vm_ip in self.executors and command:
-                            executor = self.executors[vm_ip]
-                            # Use asyncio.to_thread to avoid blocking the event loop with synchronous SSH calls
-                            status, stdout, stderr = await asyncio.to_thread(
-                                executor.execute, command
-                            )
-                            result = f"Command: {command}\nStatus: {status}\nSTDOUT: {stdout}\nSTDERR: {stderr}"
-                            # Log the action result
-                            agent_logger.log(
-                                self.agent_label,
-                                f"Result of: {command}",
-                                action=command,
-                                result=result,
-                            )
-
-                            await self.agora.post(
-                                self.agent_label,
-                                result,
-                                "action",
-                                metadata={"vm_ip": vm_ip, "command": command},
-                            )
-
-                # Add to local history
-                self.history.append({"role": "assistant", "content": response_str})
-                if len(self.history) > 20:
-                    self.history = self.history[-20:]
+                else:
+                    await self.act(
+                        system_prompt,
+                        context_message,
+                        new_activity,
+                        pending_queries,
+                        budget,
+                        others_active,
+                    )
 
             except Exception as e:
                 print(f"Error in agent {self.user_id} loop: {e}")
-                await asyncio.sleep(30)
+                self.scheduler.record_error()
+
+            # End of tick: commit everything posted during it in one transaction
+            try:
+                await self.checkpoint()
+                await self.agora.flush()
+            except Exception as e:
+                print(f"Error flushing Agora for agent {self.user_id}: {e}")
+
+            if self.stop_requested:
+                break
+            # Wait for the next tick, or until a query or mention wakes us
+            await self.scheduler.wait()
 
-            # Wait before next iteration
-            await asyncio.sleep(15)
+        watcher.cancel()
+        try:
+            await watcher
+        except (asyncio.CancelledError, Exception):
+            pass
 
         # Cleanup on stop
+        await self.checkpoint(force=True)
+        self.write_status("stopped")
         await self.agora.update_registry(
             self.agent_label,
             os.getpid(),
@@ -260,3 +612,4 @@ class Agent:
         await self.agora.post(
             self.agent_label, f"Agent {self.agent_label} shut down.", "message"
         )
+        await self.agora.flush()
@@ -1,50 +1,234 @@
 from openai import AsyncOpenAI
+from openai.types import CompletionUsage
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from ..agents.cassette import CassetteClient
+from ..agents.context import estimate_prompt, estimate_tokens
+from ..agents.rate_limiter import RateLimiter, retry_after
+from ..agents.router import ModelRouter, Route
+from ..communication.agora import TokenUsage
 from ..utils.config import config
+from ..utils.logger import agent_logger
 import asyncio
 import random
+import time
+
+
+# Models that take explicit cache breakpoints through OpenRouter; other
+# providers cache a repeated prompt prefix automatically
+CACHE_CONTROL_PREFIXES = ("anthropic/", "google/gemini")
+
+
+def create_client():
+    # LLM_BASE_URL can point at any OpenAI-compatible server, e.g. the local
+    # stub (python main.py stub); LLM_BACKEND=record|replay adds a cassette
+    if config.LLM_BACKEND == "replay":
+        return CassetteClient("replay")
+    client = AsyncOpenAI(
+        base_url=config.LLM_BASE_URL,
+        api_key=config.OPENROUTER_API_KEY or "unused",
+    )
+    if config.LLM_BACKEND == "record":
+        return CassetteClient("record", client=client)
+    return client
 
 
 class Brain:
-    def __init__(self):
-        self.client = AsyncOpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=config.OPENROUTER_API_KEY,
-        )
+    def __init__(
+        self,
+        agent_id: str = "unknown",
+        on_usage: Optional[Callable[[TokenUsage], Awaitable[None]]] = None,
+        client: Optional[AsyncOpenAI] = None,
+        limiter: Optional[RateLimiter] = None,
+        router: Optional[ModelRouter] = None,
+    ):
+        # Agents sharing a process can share one client (and its HTTP pool)
+        self.client = client or create_client()
+        # Shared with every other agent on the host through its SQLite file
+        self.limiter = limiter or RateLimiter()
+        # Chooses the fast or strong model for each call
+        self.router = router or ModelRouter()
         self.total_tokens = 0
         self.last_context_tokens = 0
+        # Called with a TokenUsage sample after every completed call
+        self.agent_id = agent_id
+        self.on_usage = on_usage
 
-    async def think(
-        self, system_prompt: str, messages: list, max_retries: int = 5
-    ) -> str:
-        retries = 0
-        while retries < max_retries:
-            try:
-                response = await self.client.chat.completions.create(
-                    extra_headers={
-                        "HTTP-Referer": "https://github.com/agent-chaos",
-                        "X-Title": "Agent Chaos",
-                    },
-                    model=config.GEMINI_MODEL,
-                    messages=[{"role": "system", "content": system_prompt}, *messages],
-                )
+    def _request(self, system_prompt: str, messages: list, model: str, json_mode: bool):
+        request = {
+            "extra_headers": {
+                "HTTP-Referer": "https://github.com/agent-chaos",
+                "X-Title": "Agent Chaos",
+            },
+            "model": model,
+            "messages": [self._system_message(system_prompt, model), *messages],
+        }
+        if json_mode:
+            # Provider-side JSON output, so responses no longer come back fenced
+            request["response_format"] = {"type": "json_object"}
+        return request
 
-                # Token tracking
-                usage = response.usage
-                if usage:
-                    self.total_tokens += usage.total_tokens
-                    self.last_context_tokens = (
-                        usage.prompt_tokens + usage.completion_tokens
-                    )
+    def _system_message(self, system_prompt: str, model: str) -> dict:
+        if config.PROMPT_CACHE_CONTROL and model.startswith(CACHE_CONTROL_PREFIXES):
+            # Mark the static system prompt as a cacheable prefix
+            return {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": system_prompt,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+            }
+        return {"role": "system", "content": system_prompt}
 
-                return response.choices[0].message.content or ""
+    async def _create(self, request: dict, max_retries: int) -> tuple:
+        # Returns the response, when the successful attempt was sent (so latency
+        # excludes time queued in the rate limiter) and the token estimate
+        estimate = (
+            estimate_prompt("", request["messages"]) + config.LLM_COMPLETION_ESTIMATE
+        )
+        retries = 0
+        while True:
+            await self.limiter.acquire(estimate, self.agent_id)
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(**request)
+                return response, started, estimate
             except Exception as e:
-                if "429" in str(e):
+                if "429" in str(e) and retries < max_retries:
                     retries += 1
-                    wait_time = (2**retries) + random.random()
+                    # The rejected call used nothing; honour Retry-After for
+                    # every agent on the host, not just this one
+                    await self.limiter.settle(estimate, 0)
+                    wait_time = retry_after(e) or (2**retries) + random.random()
                     print(
                         f"DEBUG: Rate limited (429). Retrying in {wait_time:.2f}s... (Attempt {retries}/{max_retries})"
                     )
-                    await asyncio.sleep(wait_time)
+                    if self.limiter.enabled:
+                        await self.limiter.pause(wait_time)
+                    else:
+                        await asyncio.sleep(wait_time)
                 else:
+                    # Give the reservation back so failed calls don't throttle
+                    # every agent on the host
+                    try:
+                        await self.limiter.settle(estimate, 0)
+                    except Exception as settle_error:
+                        print(
+                            f"Failed to settle rate limiter for {self.agent_id}: {settle_error}"
+                        )
                     raise e
-        return "ERROR: Max retries exceeded for OpenRouter request."
+
+    async def think(
+        self,
+        system_prompt: str,
+        messages: list,
+        max_retries: int = 5,
+        model: Optional[str] = None,
+        json_mode: bool = False,
+        route: Optional[Route] = None,
+    ) -> str:
+        # Unrouted calls go to the strong model; an explicit model overrides
+        route = route or self.router.route("default")
+        model = model or route.model
+        try:
+            response, started, estimate = await self._create(
+                self._request(system_prompt, messages, model, json_mode), max_retries
+            )
+        except Exception as e:
+            if "429" in str(e):
+                return "ERROR: Max retries exceeded for OpenRouter request."
+            raise
+        if response.usage:
+            await self._track_usage(response.usage, model, started, estimate, route)
+        return response.choices[0].message.content or ""
+
+    async def stream(
+        self,
+        system_prompt: str,
+        messages: list,
+        max_retries: int = 5,
+        model: Optional[str] = None,
+        json_mode: bool = False,
+        route: Optional[Route] = None,
+    ) -> AsyncIterator[str]:
+        # Yields completion text as it arrives; usage comes in the final chunk
+        route = route or self.router.route("default")
+        model = model or route.model
+        request = self._request(system_prompt, messages, model, json_mode)
+        request["stream"] = True
+        request["stream_options"] = {"include_usage": True}
+        response, started, estimate = await self._create(request, max_retries)
+        usage = None
+        text = []
+        try:
+            async for chunk in response:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closed early (parse error, cancellation): release the HTTP stream
+            # and count the call from estimates, since the usage chunk never came
+            close = getattr(response, "close", None) or getattr(
+                response, "aclose", None
+            )
+            if close is not None:
+                await close()
+            if usage is None:
+                prompt_tokens = estimate - config.LLM_COMPLETION_ESTIMATE
+                completion_tokens = estimate_tokens("".join(text))
+                usage = CompletionUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens,
+                )
+            await self._track_usage(usage, model, started, estimate, route)
+
+    async def _track_usage(
+        self, usage, model: str, started: float, estimate: int, route: Route
+    ):
+        try:
+            await self.limiter.settle(estimate, usage.total_tokens)
+        except Exception as e:
+            print(f"Failed to settle rate limiter for {self.agent_id}: {e}")
+        self.total_tokens += usage.total_tokens
+        self.last_context_tokens = usage.prompt_tokens + usage.completion_tokens
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.router.record(model, latency_ms)
+        try:
+            agent_logger.log_route(
+                self.agent_id,
+                route.task,
+                route.tier,
+                model,
+                route.reason,
+                latency_ms,
+                usage.total_tokens,
+            )
+        except OSError as e:
+            print(f"Failed to log routing decision for {self.agent_id}: {e}")
+        await self._report_usage(
+            TokenUsage(
+                agent_id=self.agent_id,
+                model=model,
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                total_tokens=usage.total_tokens,
+                latency_ms=latency_ms,
+                cached_tokens=cached_tokens,
+            )
+        )
+
+    async def _report_usage(self, usage: TokenUsage):
+        if self.on_usage is None:
+            return
+        try:
+            await self.on_usage(usage)
+        except Exception as e:
+            # Metrics must never break thinking
+            print(f"Failed to record token usage for {self.agent_id}: {e}")
@@ -0,0 +1,108 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+from ..communication.agora import Agora, UsageRollup
+from ..utils.config import config
+
+# Escalating responses as usage approaches a limit: shrink the prompt, then
+# tick less often, then stop calling the model
+LEVELS = [(0.75, "ok"), (0.9, "trim"), (1.0, "slow")]
+
+
+def budget_level(fraction: float) -> str:
+    for threshold, level in LEVELS:
+        if fraction < threshold:
+            return level
+    return "pause"
+
+
+class BudgetStatus(NamedTuple):
+    level: str
+    fraction: float  # highest share of any configured limit, incl. the upcoming call
+    agent_hour: int
+    agent_day: int
+    global_hour: int
+    global_day: int
+
+    def to_dict(self) -> dict:
+        return {**self._asdict(), "fraction": round(self.fraction, 3)}
+
+
+class TokenBudget:
+    # Per-agent and host-wide hourly/daily token limits (0 disables one),
+    # measured over rolling windows of the Agora usage rollups
+    def __init__(
+        self,
+        agora: Agora,
+        agent_label: str,
+        agent_per_hour: int = config.AGENT_TOKENS_PER_HOUR,
+        agent_per_day: int = config.AGENT_TOKENS_PER_DAY,
+        global_per_hour: int = config.GLOBAL_TOKENS_PER_HOUR,
+        global_per_day: int = config.GLOBAL_TOKENS_PER_DAY,
+        refresh_interval: float = 5.0,
+    ):
+        self.agora = agora
+        self.agent_label = agent_label
+        self.limits = {
+            "agent_hour": agent_per_hour,
+            "agent_day": agent_per_day,
+            "global_hour": global_per_hour,
+            "global_day": global_per_day,
+        }
+        self.refresh_interval = refresh_interval
+        self.status: Optional[BudgetStatus] = None
+        self._usage: Dict[str, int] = dict.fromkeys(self.limits, 0)
+        self._refreshed = 0.0
+        # The agent's running token total when the rollups were last read
+        self._spent_at_refresh = 0
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.limits.values())
+
+    async def _refresh(self, spent: int):
+        now = datetime.now(timezone.utc)
+        hour: List[UsageRollup] = await self.agora.get_usage_by_agent(
+            now - timedelta(hours=1), "minute"
+        )
+        day: List[UsageRollup] = await self.agora.get_usage_by_agent(
+            now - timedelta(days=1), "hour"
+        )
+        self._usage = {
+            "agent_hour": sum(
+                u.total_tokens for u in hour if u.agent_id == self.agent_label
+            ),
+            "agent_day": sum(
+                u.total_tokens for u in day if u.agent_id == self.agent_label
+            ),
+            "global_hour": sum(u.total_tokens for u in hour),
+            "global_day": sum(u.total_tokens for u in day),
+        }
+        self._refreshed = time.monotonic()
+        self._spent_at_refresh = spent
+
+    async def check(self, upcoming: int = 0, spent: int = 0) -> BudgetStatus:
+        # upcoming: estimated tokens of the call about to be made; spent: the
+        # agent's running token total, so its own calls since the rollups were
+        # last read count straight away
+        if not self.enabled:
+            self.status = BudgetStatus("ok", 0.0, 0, 0, 0, 0)
+            return self.status
+        if time.monotonic() - self._refreshed >= self.refresh_interval:
+            await self._refresh(spent)
+        unread = max(0, spent - self._spent_at_refresh)
+        usage = {name: used + unread for name, used in self._usage.items()}
+        fraction = max(
+            (usage[name] + upcoming) / limit
+            for name, limit in self.limits.items()
+            if limit
+        )
+        self.status = BudgetStatus(
+            budget_level(fraction),
+            fraction,
+            usage["agent_hour"],
+            usage["agent_day"],
+            usage["global_hour"],
+            usage["global_day"],
+        )
+        return self.status
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Optional
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from ..utils.config import config
+
+
+def _hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def request_key(request: dict) -> str:
+    # Everything that shapes the completion; headers and transport options don't
+    return _hash(
+        {
+            "model": request.get("model"),
+            "messages": request.get("messages"),
+            "response_format": request.get("response_format"),
+            "stream": bool(request.get("stream")),
+        }
+    )
+
+
+def conversation_key(request: dict) -> str:
+    # Same model and system prompt: one agent's (or one task's) line of calls
+    messages = request.get("messages") or [{}]
+    return _hash(
+        {
+            "model": request.get("model"),
+            "system": messages[0].get("content"),
+            "stream": bool(request.get("stream")),
+        }
+    )
+
+
+class CassetteClient:
+    # Stands in for AsyncOpenAI's chat.completions.create. "record" passes calls
+    # through to a real client and saves each request/response pair under its
+    # prompt hash; "replay" serves them back without touching the network.
+    # Replay falls back to the next unused recording with the same system
+    # prompt, since agent context embeds timestamps that never repeat exactly.
+    def __init__(
+        self,
+        mode: str,
+        cassette_dir: str = config.LLM_CASSETTE_DIR,
+        client: Optional[AsyncOpenAI] = None,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == "record" and client is None:
+            raise ValueError("Recording needs a real client to pass calls to")
+        self.mode = mode
+        self.cassette_dir = cassette_dir
+        self.client = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._recordings: Dict[str, dict] = {}
+        self._sequences: Dict[str, deque] = defaultdict(deque)
+        os.makedirs(cassette_dir, exist_ok=True)
+        if mode == "replay":
+            self._load()
+
+    async def close(self):
+        # Replay holds no connections; record owns the real client's HTTP pool
+        if self.client is not None:
+            await self.client.close()
+
+    def _load(self):
+        entries = []
+        for filename in os.listdir(self.cassette_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cassette_dir, filename)) as f:
+                    entries.append(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Skipping unreadable cassette {filename}: {e}")
+        for entry in sorted(entries, key=lambda e: e.get("recorded", 0)):
+            self._recordings.setdefault(entry["key"], entry)
+            self._sequences[entry["conversation"]].append(entry)
+
+    def _save(self, request: dict, response=None, chunks=None):
+        key = request_key(request)
+        entry = {
+            "key": key,
+            "conversation": conversation_key(request),
+            "recorded": time.time_ns(),
+            "request": {k: v for k, v in request.items() if k != "extra_headers"},
+            "response": response,
+            "chunks": chunks,
+        }
+        path = os.path.join(self.cassette_dir, f"{key}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(entry, f)
+        os.replace(path + ".tmp", path)
+
+    async def create(self, **request):
+        if self.mode == "replay":
+            return self._replay(request)
+        response = await self.client.chat.completions.create(**request)
+        if request.get("stream"):
+            return self._record_stream(request, response)
+        self._save(request, response=response.model_dump(mode="json"))
+        return response
+
+    async def _record_stream(self, request: dict, stream) -> AsyncIterator:
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk.model_dump(mode="json"))
+            yield chunk
+        self._save(request, chunks=chunks)
+
+    def _replay(self, request: dict):
+        entry = self._recordings.get(request_key(request))
+        sequence = self._sequences.get(conversation_key(request))
+        if entry is not None:
+            if sequence and entry in sequence:
+                sequence.remove(entry)
+        elif sequence:
+            entry = sequence.popleft()
+        else:
+            raise LookupError(
+                f"No recording for request {request_key(request)[:12]} ({request.get('model')})"
+            )
+        if request.get("stream"):
+            return self._replay_stream(entry["chunks"] or [])
+        return ChatCompletion.model_validate(entry["response"])
+
+    async def _replay_stream(self, chunks: list) -> AsyncIterator:
+        for chunk in chunks:
+            yield ChatCompletionChunk.model_validate(chunk)
@@ -0,0 +1,136 @@
+from typing import Dict, List, Sequence
+from ..communication.agora import AgoraRecord, ServiceRecord
+from ..utils.config import config
+
+# Sections in the order they are given room in the budget
+SECTION_ORDER = [
+    "queries",
+    "own_actions",
+    "mentions",
+    "messages",
+    "services",
+    "bulk_output",
+]
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token; close enough for budgeting
+    return (len(text) + 3) // 4
+
+
+def estimate_prompt(system_prompt: str, messages: list) -> int:
+    # Pre-flight size of an assembled request, before it is sent
+    total = estimate_tokens(system_prompt)
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content)
+        total += estimate_tokens(content or "") + 4  # role and framing
+    return total
+
+
+def elide(text: str, max_chars: int) -> str:
+    # Keep the head and the tail of long command output, where the command echo
+    # and the error usually are
+    if len(text) <= max_chars:
+        return text
+    keep = max_chars // 2
+    return (
+        f"{text[:keep]}\n... [{len(text) - 2 * keep} chars elided] ...\n{text[-keep:]}"
+    )
+
+
+class ContextBuilder:
+    def __init__(
+        self,
+        agent_label: str,
+        budget: int = config.AGENT_CONTEXT_BUDGET,
+        max_output_chars: int = config.AGENT_MAX_OUTPUT_CHARS,
+    ):
+        self.agent_label = agent_label
+        self.budget = budget
+        self.max_output_chars = max_output_chars
+        # Filled by build(): estimated tokens used and entries dropped per section
+        self.section_tokens: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.section_tokens.values())
+
+    def _classify(self, msg: AgoraRecord) -> str:
+        if msg.type in ("action", "action_progress"):
+            return "own_actions" if msg.agent_id == self.agent_label else "bulk_output"
+        if msg.agent_id != self.agent_label and self.agent_label in (msg.content or ""):
+            return "mentions"
+        return "messages"
+
+    def _feed_line(self, msg: AgoraRecord, section: str) -> str:
+        content = msg.content or ""
+        if section == "own_actions":
+            content = elide(content, self.max_output_chars)
+        elif section == "bulk_output":
+            content = elide(content, self.max_output_chars // 4)
+        return f"[{msg.timestamp}] {msg.agent_id} ({msg.type}): {content}\n"
+
+    def build(
+        self,
+        feed: Sequence[AgoraRecord],
+        queries: List[str],
+        services: Sequence[ServiceRecord],
+    ) -> str:
+        self.section_tokens = dict.fromkeys(SECTION_ORDER, 0)
+        self.dropped = dict.fromkeys(SECTION_ORDER, 0)
+        remaining = self.budget
+
+        # Operator queries always go in, whatever they cost
+        query_block = ""
+        if queries:
+            query_block = (
+                "\nURGENT: The human operator (Gradius) has asked you specifically:\n"
+            )
+            for q in queries:
+                query_block += f"- {q}\n"
+            query_block += "Please address these queries directly in your thoughts and responses.\n"
+            self.section_tokens["queries"] = estimate_tokens(query_block)
+            remaining -= self.section_tokens["queries"]
+
+        candidates: Dict[str, list] = {name: [] for name in SECTION_ORDER}
+        for index, msg in enumerate(feed):
+            section = self._classify(msg)
+            candidates[section].append((index, self._feed_line(msg, section)))
+        for svc in services:
+            candidates["services"].append(
+                (
+                    len(candidates["services"]),
+                    f"- {svc.service_name} on {svc.vm_ip} (started by {svc.agent_id}): {svc.description}\n",
+                )
+            )
+
+        # Fill the budget section by section, newest entries first, so whatever
+        # is dropped is the oldest and least important
+        chosen: Dict[str, list] = {name: [] for name in SECTION_ORDER}
+        for section in SECTION_ORDER[1:]:
+            for index, line in reversed(candidates[section]):
+                cost = estimate_tokens(line)
+                if cost > remaining:
+                    self.dropped[section] += 1
+                    continue
+                remaining -= cost
+                self.section_tokens[section] += cost
+                chosen[section].append((index, line))
+
+        # The feed is still rendered in chronological order
+        feed_lines = sorted(
+            chosen["own_actions"]
+            + chosen["mentions"]
+            + chosen["messages"]
+            + chosen["bulk_output"]
+        )
+        context = "Recent Agora Activity:\n"
+        context += "".join(line for _, line in feed_lines)
+        context += query_block
+        if chosen["services"]:
+            context += "\nCurrently Registered Services:\n"
+            context += "".join(line for _, line in sorted(chosen["services"]))
+        return context
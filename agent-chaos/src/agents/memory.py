@@ -0,0 +1,93 @@
+from ..agents.brain import Brain
+from ..communication.agora import Agora, AgentMemory
+from ..utils.config import config
+
+SUMMARY_PROMPT = """
+You maintain the long-term memory of {agent_label}, an autonomous agent working on shared Linux VMs.
+Merge the existing memory with the new turns below into one updated memory of at most {max_words} words.
+Keep: goals, projects in progress and where their files and services live, commands that worked or failed,
+relationships and agreements with other agents, and anything promised to the human operator.
+Drop: repeated chatter, full command output and anything superseded.
+Write it in the second person ("You ...") and output only the memory.
+
+Existing memory:
+{summary}
+
+New turns (oldest first):
+{turns}
+"""
+
+
+class Memory:
+    # Rolling summary of older turns plus the last few verbatim, persisted in the
+    # Agora so an agent picks up where it left off after a restart
+    def __init__(
+        self,
+        agora: Agora,
+        brain: Brain,
+        agent_label: str,
+        keep_turns: int = config.AGENT_MEMORY_TURNS,
+        batch: int = config.AGENT_MEMORY_BATCH,
+        # Empty: whatever the router's fast tier is
+        model: str = config.MEMORY_MODEL,
+        max_words: int = 300,
+    ):
+        self.agora = agora
+        self.brain = brain
+        self.keep_turns = keep_turns
+        self.batch = batch
+        self.model = model
+        self.max_words = max_words
+        self.state = AgentMemory(agent_id=agent_label)
+
+    async def load(self, agent_label: str):
+        self.state = await self.agora.get_memory(agent_label) or AgentMemory(
+            agent_id=agent_label
+        )
+
+    def messages(self) -> list:
+        messages = []
+        if self.state.summary:
+            messages.append(
+                {
+                    "role": "user",
+                    "content": f"Your memory of earlier activity:\n{self.state.summary}",
+                }
+            )
+        return messages + self.state.turns
+
+    async def add_turn(self, role: str, content: str):
+        self.state.turns.append({"role": role, "content": content})
+        # Summarize in batches rather than every turn so the cheap call stays rare
+        if len(self.state.turns) >= self.keep_turns + self.batch:
+            await self.compact()
+        await self.agora.save_memory(self.state)
+
+    async def compact(self):
+        older = self.state.turns[: -self.keep_turns or None]
+        if not older:
+            return
+        prompt = SUMMARY_PROMPT.format(
+            agent_label=self.state.agent_id,
+            max_words=self.max_words,
+            summary=self.state.summary or "(none yet)",
+            turns="\n\n".join(f"[{t['role']}] {t['content']}" for t in older),
+        )
+        try:
+            summary = await self.brain.think(
+                "You are a concise memory summarizer.",
+                [{"role": "user", "content": prompt}],
+                model=self.model or None,
+                route=self.brain.router.route("memory"),
+            )
+        except Exception as e:
+            summary = f"ERROR: {e}"
+        if not summary.strip() or summary.startswith("ERROR:"):
+            # Keep the turns and retry next time, but never let them pile up
+            print(f"Memory compaction failed for {self.state.agent_id}: {summary}")
+            limit = self.keep_turns + self.batch * 2
+            self.state.turns = self.state.turns[-limit:]
+            return
+        self.state.summary = summary.strip()
+        self.state.summarized_turns += len(older)
+        self.state.turns = self.state.turns[len(older) :]
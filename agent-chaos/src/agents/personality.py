@@ -3,16 +3,26 @@ import os
 from ..agents.brain import Brain
 from ..utils.config import config
 
+GENERIC_PERSONA = "A generic helpful but chaotic AI agent."
+
+
+def persona_usable(persona: str) -> bool:
+    # Brain.think reports giving up as an "ERROR: ..." string
+    return bool(persona.strip()) and not persona.startswith("ERROR:")
+
 
 class Personality:
     def __init__(self, user_id: int):
         self.user_id = user_id
         self.logs_path = f"data/logs/{user_id}.json"
         self.persona_profile = ""
+        # True while running on the generic stand-in after generation failed;
+        # such a persona is never checkpointed, so the next start retries
+        self.persona_pending = False
 
     async def initialize(self, brain: Brain):
         if not os.path.exists(self.logs_path):
-            self.persona_profile = "A generic helpful but chaotic AI agent."
+            self.persona_profile = GENERIC_PERSONA
             return
 
         with open(self.logs_path, "r") as f:
@@ -39,11 +49,20 @@ class Personality:
         Output only the personality profile as a system prompt.
         """
 
-        self.persona_profile = await brain.think(
-            "You are a personality analyst.", [{"role": "user", "content": prompt}]
+        persona = await brain.think(
+            "You are a personality analyst.",
+            [{"role": "user", "content": prompt}],
+            route=brain.router.route("persona"),
         )
+        if not persona_usable(persona):
+            print(f"Persona generation failed for {self.user_id}: {persona}")
+            persona = GENERIC_PERSONA
+            self.persona_pending = True
+        self.persona_profile = persona
 
-    def get_system_prompt(self, context: str, agent_label: str) -> str:
+    def get_system_prompt(self, agent_label: str) -> str:
+        # Only content that is stable for the agent's lifetime goes here, so the
+        # provider can cache it as a prefix; the Agora context goes last
         return f"""
         {self.persona_profile}
         
@@ -66,8 +85,6 @@ class Personality:
         If asked for your "profile" or "identity", share the personality profile generated for you.
         If asked about your "thoughts" or "feelings", be deep and introspective.
         
-        {context}
-        
         Available tools:
         - execute_command(vm_ip, command): Run a bash command on a target VM.
         - post_message(content): Send a public message to other agents. BE VERBOSE AND DETAILED.
@@ -90,3 +107,9 @@ class Personality:
             ]
         }}
         """
+
+    def get_context_message(self, context: str) -> dict:
+        return {
+            "role": "user",
+            "content": f"{context}\nDecide what to do next and respond with the JSON object.",
+        }
@@ -0,0 +1,198 @@
+import aiosqlite
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Optional
+from ..utils.config import config
+
+# Tickets whose owner stopped polling (a crashed process) are dropped after this
+STALE_TICKET_SECONDS = 10.0
+
+
+class RateLimiter:
+    # Requests/min and tokens/min token buckets shared by every process on the
+    # host through a small SQLite file. Callers queue FIFO on tickets, so a
+    # burst of agents is served in arrival order instead of racing, and a
+    # Retry-After from the provider pauses everyone at once.
+    def __init__(
+        self,
+        db_path: str = config.LLM_LIMITER_DB,
+        requests_per_min: float = config.LLM_REQUESTS_PER_MIN,
+        tokens_per_min: float = config.LLM_TOKENS_PER_MIN,
+        poll_interval: float = 0.1,
+    ):
+        self.db_path = db_path
+        self.requests_per_min = requests_per_min
+        self.tokens_per_min = tokens_per_min
+        self.poll_interval = poll_interval
+        self._initialized = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_min > 0 or self.tokens_per_min > 0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path, timeout=30.0, isolation_level=None)
+        if not self._initialized:
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL, updated REAL)"
+            )
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, owner TEXT, seen REAL)"
+            )
+            await db.execute(
+                "CREATE TABLE IF NOT EXISTS pauses (name TEXT PRIMARY KEY, until REAL)"
+            )
+            self._initialized = True
+        return db
+
+    async def _level(
+        self, db: aiosqlite.Connection, name: str, per_min: float, now: float
+    ) -> float:
+        # Current bucket level after refilling for the time since the last update
+        async with db.execute(
+            "SELECT level, updated FROM buckets WHERE name = ?", (name,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return per_min
+        return min(per_min, row[0] + (now - row[1]) * per_min / 60)
+
+    async def _set_level(
+        self, db: aiosqlite.Connection, name: str, level: float, now: float
+    ):
+        await db.execute(
+            "INSERT OR REPLACE INTO buckets (name, level, updated) VALUES (?, ?, ?)",
+            (name, level, now),
+        )
+
+    async def acquire(self, tokens: int, owner: str = "") -> float:
+        # Waits for a request slot and `tokens` of budget; returns seconds waited
+        if not self.enabled:
+            return 0.0
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        started = time.monotonic()
+        db = await self._connect()
+        try:
+            cursor = await db.execute(
+                "INSERT INTO tickets (owner, seen) VALUES (?, ?)", (owner, time.time())
+            )
+            ticket = cursor.lastrowid
+        except BaseException:
+            await db.close()
+            raise
+        try:
+            while True:
+                wait = await self._try_take(db, ticket, tokens)
+                if wait <= 0:
+                    return time.monotonic() - started
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            # Cancelled or failed: give up our place in the queue
+            try:
+                await db.execute("DELETE FROM tickets WHERE id = ?", (ticket,))
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            await db.close()
+
+    async def _try_take(
+        self, db: aiosqlite.Connection, ticket: int, tokens: int
+    ) -> float:
+        # One attempt under the write lock; returns 0 once taken, otherwise how
+        # long to wait before trying again
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            wait = await self._take_locked(db, ticket, tokens, time.time())
+        except BaseException:
+            await db.execute("ROLLBACK")
+            raise
+        await db.execute("COMMIT")
+        return wait
+
+    async def _take_locked(
+        self, db: aiosqlite.Connection, ticket: int, tokens: int, now: float
+    ) -> float:
+        await db.execute("UPDATE tickets SET seen = ? WHERE id = ?", (now, ticket))
+        await db.execute(
+            "DELETE FROM tickets WHERE seen < ?", (now - STALE_TICKET_SECONDS,)
+        )
+        async with db.execute("SELECT MIN(id) FROM tickets") as cursor:
+            head = (await cursor.fetchone())[0]
+        if head != ticket:
+            return self.poll_interval
+
+        async with db.execute(
+            "SELECT until FROM pauses WHERE name = 'retry_after'"
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row and row[0] > now:
+            return row[0] - now
+
+        wait = 0.0
+        requests = tokens_level = None
+        if self.requests_per_min > 0:
+            requests = await self._level(db, "requests", self.requests_per_min, now)
+            if requests < 1:
+                wait = max(wait, (1 - requests) * 60 / self.requests_per_min)
+        if self.tokens_per_min > 0:
+            tokens_level = await self._level(db, "tokens", self.tokens_per_min, now)
+            # A single call larger than the whole bucket waits for a full one
+            needed = min(tokens, self.tokens_per_min)
+            if tokens_level < needed:
+                wait = max(wait, (needed - tokens_level) * 60 / self.tokens_per_min)
+        if wait > 0:
+            return wait
+
+        if requests is not None:
+            await self._set_level(db, "requests", requests - 1, now)
+        if tokens_level is not None:
+            await self._set_level(db, "tokens", tokens_level - tokens, now)
+        await db.execute("DELETE FROM tickets WHERE id = ?", (ticket,))
+        return 0.0
+
+    async def settle(self, estimated: int, actual: int):
+        # Corrects the token bucket once the real usage of a call is known
+        if self.tokens_per_min <= 0 or estimated == actual:
+            return
+        db = await self._connect()
+        try:
+            now = time.time()
+            await db.execute("BEGIN IMMEDIATE")
+            level = await self._level(db, "tokens", self.tokens_per_min, now)
+            await self._set_level(db, "tokens", level + estimated - actual, now)
+            await db.execute("COMMIT")
+        finally:
+            await db.close()
+
+    async def pause(self, seconds: float):
+        # Provider asked us to back off (429 / Retry-After): pause every caller
+        if not self.enabled:
+            return
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        db = await self._connect()
+        try:
+            await db.execute(
+                """
+                INSERT INTO pauses (name, until) VALUES ('retry_after', ?)
+                ON CONFLICT(name) DO UPDATE SET until = MAX(until, excluded.until)
+                """,
+                (time.time() + seconds,),
+            )
+        finally:
+            await db.close()
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    # Seconds from a Retry-After header on an API error, if there is one
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,87 @@
+from collections import Counter, defaultdict
+from typing import Dict, NamedTuple
+from ..utils.config import config
+
+
+class Route(NamedTuple):
+    tier: str  # "fast" or "strong"
+    model: str
+    reason: str
+    task: str
+
+
+class ModelRouter:
+    # Picks a model per call: the fast one for background work and idle ticks,
+    # the strong one whenever someone is waiting on the answer or the agent is
+    # in the middle of real work
+    def __init__(
+        self,
+        fast_model: str = config.FAST_MODEL,
+        strong_model: str = config.STRONG_MODEL,
+        enabled: bool = config.MODEL_CASCADE,
+        busy_rows: int = config.ROUTER_BUSY_ROWS,
+    ):
+        self.models = {"fast": fast_model, "strong": strong_model}
+        self.enabled = enabled
+        self.busy_rows = busy_rows
+        self.decisions: Counter = Counter()
+        self.escalations = 0
+        self.calls: Counter = Counter()
+        self._latency_ms: Dict[str, float] = defaultdict(float)
+
+    def _route(self, tier: str, reason: str, task: str) -> Route:
+        if not self.enabled:
+            tier, reason = "strong", "cascade disabled"
+        route = Route(tier, self.models[tier], reason, task)
+        self.decisions[tier] += 1
+        return route
+
+    def route(
+        self,
+        task: str,
+        queries: int = 0,
+        mentions: int = 0,
+        action_results: int = 0,
+        others_rows: int = 0,
+        budget_level: str = "ok",
+    ) -> Route:
+        # Background tasks never need the big model
+        if task in ("memory", "persona"):
+            return self._route("fast", task, task)
+        if task != "tick":
+            return self._route("strong", task, task)
+        if queries:
+            return self._route("strong", "operator query", task)
+        if mentions:
+            return self._route("strong", "mentioned", task)
+        # Near the token limit, only the operator and mentions get the strong model
+        if budget_level != "ok":
+            return self._route("fast", f"budget {budget_level}", task)
+        if action_results:
+            return self._route("strong", "action follow-up", task)
+        if others_rows >= self.busy_rows:
+            return self._route("strong", f"busy ({others_rows} new rows)", task)
+        if others_rows:
+            return self._route("fast", f"low change ({others_rows} new rows)", task)
+        return self._route("fast", "idle", task)
+
+    def escalate(self, route: Route, reason: str) -> Route:
+        self.escalations += 1
+        return self._route("strong", f"escalated: {reason}", route.task)
+
+    def record(self, model: str, latency_ms: float):
+        self.calls[model] += 1
+        self._latency_ms[model] += latency_ms
+
+    def stats(self) -> dict:
+        return {
+            "routes": dict(self.decisions),
+            "escalations": self.escalations,
+            "models": {
+                model: {
+                    "calls": calls,
+                    "avg_latency_ms": round(self._latency_ms[model] / calls),
+                }
+                for model, calls in self.calls.items()
+            },
+        }
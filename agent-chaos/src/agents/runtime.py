@@ -0,0 +1,57 @@
+import asyncio
+import signal
+from typing import List
+from ..agents.agent import Agent
+from ..agents.brain import Brain, create_client
+from ..bridge.discord import DiscordBridge
+from ..bridge.ssh import SSHPool
+from ..communication.agora import Agora
+from ..utils.config import config
+
+
+async def run_agents(user_ids: List[int]):
+    # Hosts many agents as asyncio tasks in one process. They share one Agora
+    # connection pool, one Discord gateway login, one HTTP client and one SSH
+    # connection per VM. Each agent still stops on its own STOP command.
+    if not user_ids:
+        print("No agents to run. Run 'scrape' first.")
+        return
+
+    agora = Agora()
+    await agora.initialize()
+
+    discord_bridge = DiscordBridge(config.DISCORD_BOT_TOKEN)
+    await discord_bridge.start()
+
+    client = create_client()
+    ssh_pool = SSHPool()
+    agents = [
+        Agent(
+            user_id,
+            agora,
+            discord_bridge,
+            brain=Brain(client=client),
+            executors=ssh_pool.executors_for(config.VM_IPS),
+        )
+        for user_id in user_ids
+    ]
+
+    def stop_all():
+        for agent in agents:
+            agent.handle_stop(signal.SIGTERM, None)
+
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop_all)
+
+    try:
+        results = await asyncio.gather(
+            *(agent.run(install_signal_handler=False) for agent in agents),
+            return_exceptions=True,
+        )
+        for agent, result in zip(agents, results):
+            if isinstance(result, BaseException):
+                print(f"Agent {agent.user_id} exited with error: {result}")
+    finally:
+        await discord_bridge.stop()
+        await asyncio.to_thread(ssh_pool.close)
+        await client.close()
+        await agora.close()
@@ -0,0 +1,103 @@
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from typing import Optional
+from ..utils.config import config
+
+
+class TickScheduler:
+    def __init__(
+        self,
+        base_interval: float = config.AGENT_TICK_INTERVAL,
+        max_interval: float = config.AGENT_MAX_TICK_INTERVAL,
+        min_interval: float = config.AGENT_MIN_TICK_INTERVAL,
+        error_interval: float = 30.0,
+        backoff: float = 1.5,
+        jitter: float = config.AGENT_TICK_JITTER,
+    ):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.min_interval = min_interval
+        self.error_interval = error_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.interval = base_interval
+        # Lower bound imposed from outside, e.g. by the token budget
+        self.floor = 0.0
+        self.ticks = 0
+        self.wake_reasons: Counter = Counter()
+        self.last_reason: Optional[str] = None
+        self.recent_intervals: deque = deque(maxlen=20)
+        self._event = asyncio.Event()
+        self._pending_reason: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_tick = time.monotonic()
+
+    def wake(self, reason: str):
+        # The first reason wins until the agent actually wakes up
+        if not self._event.is_set():
+            self._pending_reason = reason
+        self._event.set()
+
+    def wake_threadsafe(self, reason: str):
+        # For signal handlers and other threads
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self.wake, reason)
+
+    def record_tick(self, active: bool):
+        # Something relevant happened: come back at the base pace. Otherwise
+        # stretch the interval so idle agents stop burning LLM calls.
+        if active:
+            self.interval = self.base_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        self.interval = max(self.interval, min(self.floor, self.max_interval))
+
+    def set_floor(self, floor: float):
+        self.floor = floor
+        self.interval = max(self.interval, min(floor, self.max_interval))
+
+    def record_error(self):
+        self.interval = max(self.interval, self.error_interval)
+
+    async def wait(self) -> str:
+        self._loop = asyncio.get_running_loop()
+        # Jitter keeps agents that started together from ticking in lockstep
+        delay = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        reason = "timer"
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=delay)
+            reason = self._pending_reason or "wake"
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+        self._pending_reason = None
+
+        # A burst of wakes must not turn into a burst of LLM calls
+        since_last = time.monotonic() - self._last_tick
+        if since_last < self.min_interval:
+            await asyncio.sleep(self.min_interval - since_last)
+
+        now = time.monotonic()
+        self.recent_intervals.append(now - self._last_tick)
+        self._last_tick = now
+        self.ticks += 1
+        self.wake_reasons[reason] += 1
+        self.last_reason = reason
+        return reason
+
+    def stats(self) -> dict:
+        average = (
+            sum(self.recent_intervals) / len(self.recent_intervals)
+            if self.recent_intervals
+            else 0.0
+        )
+        return {
+            "ticks": self.ticks,
+            "tick_interval": round(self.interval, 1),
+            "avg_tick_interval": round(average, 1),
+            "last_wake_reason": self.last_reason,
+            "wake_reasons": dict(self.wake_reasons),
+        }
@@ -0,0 +1,128 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# ("field", key, value) when a top-level value is complete, and
+# ("item", key, value) for each element of a top-level array as it completes
+ParseEvent = Tuple[str, str, Any]
+
+
+class StreamingJSONParser:
+    # Incremental parser for a single JSON object arriving in chunks. Anything
+    # before the opening brace (a ```json fence, chatter) and after the closing
+    # brace is ignored. Malformed input raises json.JSONDecodeError.
+    def __init__(self):
+        self.buffer = ""
+        self.result: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._object_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # Where we are between the object's members: None before the opening
+        # brace, then "key" -> "colon" -> "value" -> "key" ...
+        self._state: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._array_key: Optional[str] = None
+        self._array_items = 0
+        self._item_start = 0
+
+    def _error(self, msg: str, pos: int):
+        raise json.JSONDecodeError(msg, self.buffer, pos)
+
+    def feed(self, chunk: str) -> List[ParseEvent]:
+        events: List[ParseEvent] = []
+        self.buffer += chunk
+        buf = self.buffer
+        for i in range(self._pos, len(buf)):
+            if self.done:
+                break
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start : i + 1])
+                        self._key_start = None
+                        self._state = "colon"
+                continue
+            if self._state is None:
+                if c == "{":
+                    self._state = "key"
+                    self._depth = 1
+                    self._object_start = i
+                continue
+
+            if self._depth == 1 and self._state != "value" and not c.isspace():
+                # Between members only a key, a colon or the closing brace fit
+                if self._state == "key" and c == '"':
+                    self._in_string = True
+                    self._key_start = i
+                elif self._state == "key" and c == "}" and not self.result:
+                    self._depth = 0
+                    self._finish(buf, i)
+                elif self._state == "colon" and c == ":":
+                    self._state = "value"
+                    self._value_start = i + 1
+                else:
+                    expected = "':'" if self._state == "colon" else "property name"
+                    self._error(f"Expecting {expected}", i)
+                continue
+
+            if c == '"':
+                self._in_string = True
+            elif c == ":" and self._depth == 1:
+                # A second colon in one member: the comma before it is missing
+                self._error("Expecting ',' delimiter", i)
+            elif c in "{[":
+                if (
+                    c == "["
+                    and self._depth == 1
+                    and not buf[self._value_start : i].strip()
+                ):
+                    self._array_key = self._key
+                    self._array_items = 0
+                    self._item_start = i + 1
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and c == "]" and self._array_key is not None:
+                    # An empty array is fine; an empty last item ("[1,]") is not
+                    if self._array_items or buf[self._item_start : i].strip():
+                        self._emit_item(buf[self._item_start : i], i, events)
+                    self._array_key = None
+                elif self._depth == 0:
+                    self._emit_field(buf, i, events)
+                    self._finish(buf, i)
+            elif c == ",":
+                if self._depth == 1:
+                    self._emit_field(buf, i, events)
+                    self._state = "key"
+                elif self._depth == 2 and self._array_key is not None:
+                    self._emit_item(buf[self._item_start : i], i, events)
+                    self._item_start = i + 1
+        self._pos = len(buf)
+        return events
+
+    def _finish(self, buf: str, end: int):
+        # Events were validated piece by piece; confirm the object as a whole
+        json.loads(buf[self._object_start : end + 1])
+        self.done = True
+
+    def _emit_field(self, buf: str, end: int, events: List[ParseEvent]):
+        value = json.loads(buf[self._value_start : end])
+        self.result[self._key] = value
+        events.append(("field", self._key, value))
+        self._value_start = None
+
+    def _emit_item(self, text: str, end: int, events: List[ParseEvent]):
+        if not text.strip():
+            self._error("Expecting value", end)
+        self._array_items += 1
+        events.append(("item", self._array_key, json.loads(text)))
@@ -1,6 +1,92 @@
 import paramiko
+import itertools
 import os
-from typing import Tuple
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from ..utils.config import config
+
+# Exit statuses reported for commands we gave up on, matching coreutils timeout(1)
+# and a shell killed by SIGINT
+TIMEOUT_STATUS = 124
+CANCELLED_STATUS = 130
+
+_spill_ids = itertools.count()
+
+
+class OutputCapture:
+    # Keeps at most head_bytes + tail_bytes of a stream in memory. Once output
+    # outgrows that, the middle is dropped and, if spill_dir is set, the full
+    # stream is written to a file there instead.
+    def __init__(
+        self,
+        name: str,
+        head_bytes: int = config.ACTION_OUTPUT_HEAD_BYTES,
+        tail_bytes: int = config.ACTION_OUTPUT_TAIL_BYTES,
+        spill_dir: str = config.ACTION_SPILL_DIR,
+    ):
+        self.name = name
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.spill_dir = spill_dir
+        self.spill_path: Optional[str] = None
+        self.total = 0
+        self._buffer = bytearray()
+        self._head = bytearray()
+        self._truncated = False
+        self._file = None
+
+    def write(self, data: bytes):
+        self.total += len(data)
+        if self._file is not None:
+            self._file.write(data)
+        if not self._truncated:
+            self._buffer += data
+            if len(self._buffer) <= self.head_bytes + self.tail_bytes:
+                return
+            # Nothing has been dropped yet, so the spill file can start complete
+            self._spill(bytes(self._buffer))
+            self._head = self._buffer[: self.head_bytes]
+            del self._buffer[: -self.tail_bytes or len(self._buffer)]
+            self._truncated = True
+            return
+        self._buffer += data
+        del self._buffer[: max(0, len(self._buffer) - self.tail_bytes)]
+
+    def _spill(self, data: bytes):
+        if not self.spill_dir:
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(
+                self.spill_dir,
+                f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_spill_ids)}-{self.name}.log",
+            )
+            self._file = open(self.spill_path, "wb")
+            self._file.write(data)
+        except OSError as e:
+            print(f"Could not spill command output to {self.spill_dir}: {e}")
+            self.spill_path = None
+            self._file = None
+
+    def text(self) -> str:
+        if not self._truncated:
+            return self._buffer.decode(errors="replace")
+        omitted = self.total - len(self._head) - len(self._buffer)
+        marker = f"\n... [{omitted} bytes omitted"
+        if self.spill_path:
+            marker += f"; full output in {self.spill_path}"
+        marker += "] ...\n"
+        return (
+            self._head.decode(errors="replace")
+            + marker
+            + self._buffer.decode(errors="replace")
+        )
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
 class SSHExecutor:
@@ -8,23 +94,140 @@ class SSHExecutor:
         self.host = host
         self.user = user
         self.client = None
+        # execute() runs in worker threads and may be shared between agents
+        self._lock = threading.Lock()
 
     def connect(self):
-        if self.client:
-            return
-        self.client = paramiko.SSHClient()
-        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        # Assuming the default SSH key is authorized on the target VMs
-        self.client.connect(self.host, username=self.user)
+        with self._lock:
+            if self.client:
+                return
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            # Assuming the default SSH key is authorized on the target VMs
+            client.connect(self.host, username=self.user)
+            self.client = client
 
-    def execute(self, command: str) -> Tuple[int, str, str]:
+    def execute(
+        self,
+        command: str,
+        timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress: Optional[Callable[[str], None]] = None,
+        progress_interval: float = config.ACTION_PROGRESS_INTERVAL,
+    ) -> Tuple[int, str, str]:
+        # Output is bounded by OutputCapture; on_progress (called from this
+        # thread) receives the latest output of a long command every
+        # progress_interval seconds
         self.connect()
         assert self.client is not None
-        stdin, stdout, stderr = self.client.exec_command(command)
-        exit_status = stdout.channel.recv_exit_status()
-        return exit_status, stdout.read().decode(), stderr.read().decode()
+        # The first line of stdout is the remote shell's PID, so a command we
+        # give up on can be killed instead of left running on the VM
+        stdin, stdout, stderr = self.client.exec_command(f"echo $$; {command}")
+        channel = stdout.channel
+        out, err = OutputCapture("stdout"), OutputCapture("stderr")
+        fresh = bytearray()
+        header = bytearray()
+        remote_pid: Optional[int] = None
+        started = time.monotonic()
+        last_progress = started
+        deadline = started + timeout if timeout else None
+
+        def drain():
+            nonlocal remote_pid
+            while channel.recv_ready():
+                data = channel.recv(32768)
+                if remote_pid is None:
+                    header.extend(data)
+                    if b"\n" not in header:
+                        continue
+                    line, _, data = bytes(header).partition(b"\n")
+                    remote_pid = int(line) if line.strip().isdigit() else 0
+                out.write(data)
+                if on_progress is not None:
+                    fresh.extend(data)
+                    del fresh[: max(0, len(fresh) - config.ACTION_PROGRESS_BYTES)]
+            while channel.recv_stderr_ready():
+                err.write(channel.recv_stderr(32768))
+
+        # Poll the channel instead of blocking in recv_exit_status() so a hung
+        # command can be abandoned, and drain output as it arrives so a chatty
+        # command can't stall on a full window
+        status, suffix = None, ""
+        try:
+            while True:
+                drain()
+                if channel.exit_status_ready():
+                    break
+                now = time.monotonic()
+                if cancel_event is not None and cancel_event.is_set():
+                    self._hangup(remote_pid)
+                    channel.close()
+                    status, suffix = CANCELLED_STATUS, "\n[cancelled]"
+                    break
+                if deadline is not None and now >= deadline:
+                    self._hangup(remote_pid)
+                    channel.close()
+                    status = TIMEOUT_STATUS
+                    suffix = f"\n[timed out after {timeout:.0f}s]"
+                    break
+                if (
+                    on_progress is not None
+                    and fresh
+                    and (now - last_progress >= progress_interval)
+                ):
+                    on_progress(fresh.decode(errors="replace"))
+                    fresh.clear()
+                    last_progress = now
+                time.sleep(0.05)
+
+            if status is None:
+                status = channel.recv_exit_status()
+                # Output can still be in flight after the exit status; read on
+                # until the remote end signals EOF
+                while not (channel.eof_received or channel.closed):
+                    drain()
+                    time.sleep(0.01)
+                drain()
+            if remote_pid is None:
+                out.write(bytes(header))
+        finally:
+            out.close()
+            err.close()
+        return status, out.text(), err.text() + suffix
+
+    def _hangup(self, pid: Optional[int]):
+        # sshd starts each command in its own session, so the shell's PID is
+        # also its process group. SIGHUP is what a closed terminal would send:
+        # it stops the command and its children but spares nohup'd services.
+        if not pid or self.client is None:
+            return
+        try:
+            _, stdout, _ = self.client.exec_command(f"kill -HUP -{pid}")
+            stdout.channel.status_event.wait(10)
+        except Exception as e:
+            print(f"Failed to stop remote process group {pid} on {self.host}: {e}")
 
     def close(self):
         if self.client:
             self.client.close()
             self.client = None
+
+
+class SSHPool:
+    # One executor (and SSH connection) per host, shared by every agent in a
+    # process; paramiko multiplexes concurrent commands as channels
+    def __init__(self, user: str = "root"):
+        self.user = user
+        self.executors: Dict[str, SSHExecutor] = {}
+
+    def get(self, host: str) -> SSHExecutor:
+        if host not in self.executors:
+            self.executors[host] = SSHExecutor(host, self.user)
+        return self.executors[host]
+
+    def executors_for(self, hosts: List[str]) -> Dict[str, SSHExecutor]:
+        return {host: self.get(host) for host in hosts}
+
+    def close(self):
+        for executor in self.executors.values():
+            executor.close()
@@ -1,9 +1,17 @@
 import aiosqlite
+import asyncio
 import json
-from datetime import datetime
-from typing import List, Optional
+import os
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import List, NamedTuple, Optional, Sequence
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
+from ..utils.config import config
 
 
 class AgoraMessage(BaseModel):
@@ -34,20 +42,450 @@ class AgentRegistry(BaseModel):
     last_heartbeat: Optional[str] = None
 
 
+# Compact read-only records for hot read paths. Columns are taken straight from
+# the row tuple without validation; to_model() converts when a caller needs it.
+class AgoraRecord(NamedTuple):
+    id: Optional[int]
+    agent_id: str
+    content: str
+    type: str
+    timestamp: Optional[str]
+    metadata: Optional[str]
+
+    def to_model(self) -> AgoraMessage:
+        return AgoraMessage(**self._asdict())
+
+
+class ServiceRecord(NamedTuple):
+    service_name: str
+    vm_ip: str
+    agent_id: str
+    start_time: Optional[str]
+    description: str
+    status: str
+
+    def to_model(self) -> ServiceInfo:
+        return ServiceInfo(**self._asdict())
+
+
+class RegistryRecord(NamedTuple):
+    agent_id: str
+    pid: int
+    status: str
+    total_tokens: int
+    last_context_tokens: int
+    last_heartbeat: Optional[str]
+
+    def to_model(self) -> AgentRegistry:
+        return AgentRegistry(**self._asdict())
+
+
+class OperatorQuery(BaseModel):
+    id: int
+    message_id: Optional[int] = None
+    recipient: str
+    content: str
+    created: Optional[str] = None
+
+
+class TokenUsage(BaseModel):
+    agent_id: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    latency_ms: float = 0.0
+    cached_tokens: int = 0  # prompt tokens served from the provider's cache
+    timestamp: Optional[str] = None
+
+
+class AgentMemory(BaseModel):
+    agent_id: str
+    summary: str = ""
+    turns: List[dict] = []  # recent turns still kept verbatim
+    summarized_turns: int = 0
+    updated: Optional[str] = None
+
+
+class AgentCheckpoint(BaseModel):
+    # Runtime state an agent needs to resume without redoing startup work;
+    # memory, the feed cursor and the query inbox are persisted separately
+    user_id: str
+    agent_label: str
+    username: str
+    avatar_url: Optional[str] = None
+    persona: str = ""
+    last_discord_update: float = 0
+    total_tokens: int = 0
+    last_context_tokens: int = 0
+    tick_interval: Optional[float] = None
+    updated: Optional[str] = None
+
+
+class UsageRollup(NamedTuple):
+    bucket: Optional[str]  # None when aggregated over a whole window
+    agent_id: str
+    model: str
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    latency_ms: float  # summed; divide by calls for the mean
+    cached_tokens: int
+
+
+class AgoraSubscription:
+    # Async iterator over new agora rows matching a filter. Consumers only wake
+    # when a matching row exists; change detection is shared per Agora instance.
+    def __init__(
+        self,
+        agora: "Agora",
+        agent_ids: Optional[Sequence[str]] = None,
+        msg_types: Optional[Sequence[str]] = None,
+        after_id: Optional[int] = None,
+    ):
+        self.agora = agora
+        self.agent_ids = list(agent_ids) if agent_ids else None
+        self.msg_types = list(msg_types) if msg_types else None
+        self.last_id = after_id
+        self._buffer: deque = deque()
+        self._active = False
+
+    async def start(self):
+        if self._active:
+            return
+        if self.last_id is None:
+            self.last_id = await self.agora._latest_id()
+        self.agora._add_subscriber()
+        self._active = True
+
+    def close(self):
+        if self._active:
+            self._active = False
+            self.agora._remove_subscriber()
+
+    async def __aenter__(self) -> "AgoraSubscription":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def __aiter__(self) -> "AgoraSubscription":
+        return self
+
+    async def __anext__(self) -> AgoraRecord:
+        await self.start()
+        while not self._buffer:
+            # Capture the generation before reading so a change that lands
+            # mid-query still wakes us afterwards
+            generation = self.agora._generation
+            await self._fetch()
+            if not self._buffer:
+                await self.agora._wait_for_change(generation)
+        return self._buffer.popleft()
+
+    async def get_batch(self, timeout: Optional[float] = None) -> List[AgoraRecord]:
+        # Wait up to `timeout` for at least one row, then return everything buffered.
+        # Safe to time out: rows already fetched stay buffered for the next call.
+        try:
+            first = await asyncio.wait_for(self.__anext__(), timeout=timeout)
+        except TimeoutError:
+            return []
+        batch = [first, *self._buffer]
+        self._buffer.clear()
+        return batch
+
+    async def _fetch(self):
+        assert self.last_id is not None
+        messages = await self.agora.get_since(
+            self.last_id, self.agent_ids, self.msg_types
+        )
+        if messages:
+            self._buffer.extend(messages)
+            self.last_id = messages[-1].id
+
+
+VERSION_BUMP_SQL = """
+    INSERT INTO versions (name, version) VALUES (?, 1)
+    ON CONFLICT(name) DO UPDATE SET version = version + 1
+"""
+
+HEARTBEAT_UPSERT_SQL = """
+    INSERT INTO heartbeats (agent_id, pid, total_tokens, last_context_tokens, last_heartbeat)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(agent_id) DO UPDATE SET
+        pid = excluded.pid,
+        total_tokens = excluded.total_tokens,
+        last_context_tokens = excluded.last_context_tokens,
+        last_heartbeat = excluded.last_heartbeat
+"""
+
+TOKEN_USAGE_INSERT_SQL = """
+    INSERT INTO token_usage (timestamp, agent_id, model, prompt_tokens, completion_tokens, total_tokens, latency_ms, cached_tokens)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+TOKEN_ROLLUP_UPSERT_SQL = """
+    INSERT INTO token_rollups (granularity, bucket, agent_id, model, calls, prompt_tokens, completion_tokens, total_tokens, latency_ms, cached_tokens)
+    VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
+    ON CONFLICT(granularity, bucket, agent_id, model) DO UPDATE SET
+        calls = calls + 1,
+        prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+        completion_tokens = completion_tokens + excluded.completion_tokens,
+        total_tokens = total_tokens + excluded.total_tokens,
+        latency_ms = latency_ms + excluded.latency_ms,
+        cached_tokens = cached_tokens + excluded.cached_tokens
+"""
+
+CHECKPOINT_UPSERT_SQL = """
+    INSERT INTO checkpoints (user_id, agent_label, username, avatar_url, persona, last_discord_update,
+                             total_tokens, last_context_tokens, tick_interval, updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(user_id) DO UPDATE SET
+        agent_label = excluded.agent_label,
+        username = excluded.username,
+        avatar_url = excluded.avatar_url,
+        persona = excluded.persona,
+        last_discord_update = excluded.last_discord_update,
+        total_tokens = excluded.total_tokens,
+        last_context_tokens = excluded.last_context_tokens,
+        tick_interval = excluded.tick_interval,
+        updated = excluded.updated
+"""
+
+# Bucket formats; they sort lexically in time order like the timestamps
+ROLLUP_FORMATS = {"minute": "%Y-%m-%d %H:%M", "hour": "%Y-%m-%d %H:00"}
+
+
 class Agora:
-    def __init__(self, db_path: str = "data/state/agora.sqlite"):
+    def __init__(
+        self,
+        db_path: str = "data/state/agora.sqlite",
+        readers: int = config.AGORA_READERS,
+        batch_writes: bool = config.AGORA_BATCH_WRITES,
+        batch_size: int = config.AGORA_BATCH_SIZE,
+        batch_interval: float = config.AGORA_BATCH_INTERVAL,
+        notify_interval: float = config.AGORA_NOTIFY_INTERVAL,
+        busy_timeout: float = 30.0,
+    ):
         self.db_path = db_path
+        self.max_readers = max(1, readers)
+        self.busy_timeout = busy_timeout
+        # Subscriptions share one poller per instance that watches
+        # PRAGMA data_version (a cheap check that reads no table pages) and bumps
+        # a generation counter whenever another connection commits.
+        self.notify_interval = notify_interval
+        self._generation = 0
+        self._changed = asyncio.Event()
+        self._local_write = asyncio.Event()
+        self._subscribers = 0
+        self._notifier: Optional[asyncio.Task] = None
+        # Set by initialize(), or detected lazily by search()
+        self.fts_enabled: Optional[bool] = None
+        # Per-process copies of rarely-changing tables, keyed by table name and
+        # tagged with the version counter they were read at
+        self._cache: dict = {}
+        # Last heartbeat write per agent (monotonic seconds), for throttling
+        self._heartbeats_written: dict = {}
+        # Opt-in write-behind: posts are buffered in call order and committed
+        # together on size/time thresholds, on flush(), or before any direct write.
+        self.batch_writes = batch_writes
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval
+        self._pending: List[tuple] = []
+        self._flush_wakeup = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Long-lived connections: a single writer (SQLite only allows one at a
+        # time anyway) and a small pool of readers that WAL lets run alongside it.
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._reader_count = 0
+
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        # Increase timeout and enable WAL mode for better concurrency.
+        # PRAGMAs are applied once per connection instead of once per query.
+        db = await aiosqlite.connect(self.db_path, timeout=self.busy_timeout)
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        if read_only:
+            await db.execute("PRAGMA query_only=ON")
+        return db
 
     @asynccontextmanager
-    async def _get_db(self):
-        # Increase timeout and enable WAL mode for better concurrency
-        async with aiosqlite.connect(self.db_path, timeout=30.0) as db:
-            await db.execute("PRAGMA journal_mode=WAL")
-            await db.execute("PRAGMA synchronous=NORMAL")
+    async def _write_db(self):
+        async with self._write_lock:
+            if self._writer is None:
+                self._writer = await self._connect()
+            batch = []
+            try:
+                # Buffered posts go first so a direct write never overtakes them
+                batch = await self._drain_pending(self._writer)
+                yield self._writer
+            except BaseException:
+                # Never hand a half-finished transaction to the next writer, but
+                # keep the drained posts it would take with it
+                if batch and self._writer.in_transaction:
+                    self._pending[:0] = batch
+                await self._writer.rollback()
+                raise
+        if self._subscribers:
+            self._local_write.set()
+
+    @asynccontextmanager
+    async def _read_db(self):
+        if self._readers.empty() and self._reader_count < self.max_readers:
+            self._reader_count += 1
+            try:
+                db = await self._connect(read_only=True)
+            except BaseException:
+                self._reader_count -= 1
+                raise
+        else:
+            db = await self._readers.get()
+        try:
             yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    async def _drain_pending(self, db: aiosqlite.Connection) -> List[tuple]:
+        if not self._pending:
+            return []
+        batch, self._pending = self._pending, []
+        try:
+            for sql, group in groupby(batch, key=itemgetter(0)):
+                await db.executemany(sql, [params for _, params in group])
+        except BaseException:
+            # Put the batch back in front of anything queued meanwhile
+            self._pending[:0] = batch
+            raise
+        return batch
+
+    async def _enqueue(self, sql: str, params: tuple):
+        self._pending.append((sql, params))
+        if self._flusher is None or self._flusher.done():
+            self._loop = asyncio.get_running_loop()
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_wakeup.wait(), timeout=self.batch_interval
+                )
+            except TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Agora batch flush failed (will retry): {e}")
+
+    async def flush(self):
+        if not self._pending:
+            return
+        async with self._write_db() as db:
+            await db.commit()
+
+    def request_flush(self):
+        # Safe to call from a signal handler: just wakes the flusher task
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._flush_wakeup.set)
+
+    def subscribe(
+        self,
+        agent_ids: Optional[Sequence[str]] = None,
+        msg_types: Optional[Sequence[str]] = None,
+        after_id: Optional[int] = None,
+    ) -> AgoraSubscription:
+        # Usage: async with agora.subscribe(msg_types=["user_query"]) as feed:
+        #            async for msg in feed: ...
+        # Without after_id, only rows posted after the subscription starts are seen.
+        return AgoraSubscription(self, agent_ids, msg_types, after_id)
+
+    def _add_subscriber(self):
+        self._subscribers += 1
+        if self._notifier is None or self._notifier.done():
+            self._notifier = asyncio.create_task(self._notify_loop())
+
+    def _remove_subscriber(self):
+        self._subscribers -= 1
+
+    def _bump_generation(self):
+        self._generation += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait_for_change(self, generation: int):
+        if self._generation > generation:
+            return
+        await self._changed.wait()
+
+    async def _notify_loop(self):
+        # data_version is per connection, so the poller keeps its own
+        db = await self._connect(read_only=True)
+        try:
+            last_version = None
+            while self._subscribers > 0:
+                self._local_write.clear()
+                async with db.execute("PRAGMA data_version") as cursor:
+                    row = await cursor.fetchone()
+                version = row[0] if row else None
+                if version != last_version:
+                    if last_version is not None:
+                        self._bump_generation()
+                    last_version = version
+                try:
+                    # Our own writes wake the poller immediately
+                    await asyncio.wait_for(
+                        self._local_write.wait(), timeout=self.notify_interval
+                    )
+                except TimeoutError:
+                    pass
+        finally:
+            await db.close()
+
+    async def _latest_id(self) -> int:
+        async with self._read_db() as db:
+            async with db.execute("SELECT MAX(id) FROM agora") as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row and row[0] is not None else 0
+
+    async def close(self):
+        if self._notifier is not None:
+            self._notifier.cancel()
+            try:
+                await self._notifier
+            except asyncio.CancelledError:
+                pass
+            self._notifier = None
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        # aiosqlite runs each connection on a non-daemon thread, so these must be
+        # closed for the process to exit cleanly.
+        async with self._write_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        while not self._readers.empty():
+            db = self._readers.get_nowait()
+            await db.close()
+            self._reader_count -= 1
 
     async def initialize(self):
-        async with self._get_db() as db:
+        async with self._write_db() as db:
+            # Only takes effect on a fresh database; archive() converts older ones
+            await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS agora (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -58,6 +496,41 @@ class Agora:
                     metadata TEXT
                 )
             """)
+            # Indexes matching the real access patterns: type-filtered feeds,
+            # per-agent feeds, and operator queries addressed to an agent.
+            # The rowid (id) is implicitly part of every index.
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_agora_type_id ON agora (type, id)"
+            )
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_agora_agent_type_id ON agora (agent_id, type, id)"
+            )
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_agora_user_query ON agora (agent_id, id) WHERE type = 'user_query'"
+            )
+            # Operator queries are delivered through a per-recipient inbox with
+            # explicit acks, independent of how busy the main feed is
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS inbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    message_id INTEGER,
+                    recipient TEXT,
+                    content TEXT,
+                    created DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    acked_at DATETIME
+                )
+            """)
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_inbox_pending ON inbox (recipient, id) WHERE acked_at IS NULL"
+            )
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS cursors (
+                    consumer_id TEXT PRIMARY KEY,
+                    last_id INTEGER,
+                    updated DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            await self._initialize_fts(db)
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS services (
                     service_name TEXT,
@@ -79,8 +552,319 @@ class Agora:
                     last_heartbeat DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # Liveness and token counters live apart from the registry so the
+            # per-tick heartbeat is a small, throttled in-place update
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS heartbeats (
+                    agent_id TEXT PRIMARY KEY,
+                    pid INTEGER,
+                    total_tokens INTEGER DEFAULT 0,
+                    last_context_tokens INTEGER DEFAULT 0,
+                    last_heartbeat DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Append-only log of every LLM call, plus per-minute and per-hour
+            # rollups maintained in the same transaction so summaries stay cheap
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS token_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    agent_id TEXT,
+                    model TEXT,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    total_tokens INTEGER,
+                    latency_ms REAL,
+                    cached_tokens INTEGER DEFAULT 0
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS token_rollups (
+                    granularity TEXT,
+                    bucket TEXT,
+                    agent_id TEXT,
+                    model TEXT,
+                    calls INTEGER DEFAULT 0,
+                    prompt_tokens INTEGER DEFAULT 0,
+                    completion_tokens INTEGER DEFAULT 0,
+                    total_tokens INTEGER DEFAULT 0,
+                    latency_ms REAL DEFAULT 0,
+                    cached_tokens INTEGER DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket, agent_id, model)
+                )
+            """)
+            # Databases created before prompt-cache tracking
+            for table in ("token_usage", "token_rollups"):
+                await self._ensure_column(
+                    db, table, "cached_tokens", "INTEGER DEFAULT 0"
+                )
+            # Each agent's rolling summary plus the turns not yet folded into it
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    agent_id TEXT PRIMARY KEY,
+                    summary TEXT,
+                    turns TEXT,
+                    summarized_turns INTEGER DEFAULT 0,
+                    updated DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    user_id TEXT PRIMARY KEY,
+                    agent_label TEXT,
+                    username TEXT,
+                    avatar_url TEXT,
+                    persona TEXT,
+                    last_discord_update REAL DEFAULT 0,
+                    total_tokens INTEGER DEFAULT 0,
+                    last_context_tokens INTEGER DEFAULT 0,
+                    tick_interval REAL,
+                    updated DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Change counters for cached tables, bumped in the writing transaction
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS versions (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
             await db.commit()
 
+    async def _ensure_column(
+        self, db: aiosqlite.Connection, table: str, column: str, declaration: str
+    ):
+        async with db.execute(f"PRAGMA table_info({table})") as cursor:
+            columns = [row[1] for row in await cursor.fetchall()]
+        if column not in columns:
+            try:
+                await db.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column} {declaration}"
+                )
+            except sqlite3.OperationalError as e:
+                # Another process starting at the same time migrated it first
+                if "duplicate column name" not in str(e):
+                    raise
+
+    async def _initialize_fts(self, db: aiosqlite.Connection):
+        # External-content FTS5 index over agora.content, kept in sync by triggers
+        # so the batched write path and archive() need no extra work
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'agora_fts'"
+        ) as cursor:
+            existed = await cursor.fetchone() is not None
+        try:
+            await db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS agora_fts USING fts5(content, content='agora', content_rowid='id')"
+            )
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 unavailable, Agora search will fall back to LIKE scans: {e}")
+            self.fts_enabled = False
+            return
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS agora_fts_insert AFTER INSERT ON agora BEGIN
+                INSERT INTO agora_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS agora_fts_delete AFTER DELETE ON agora BEGIN
+                INSERT INTO agora_fts (agora_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS agora_fts_update AFTER UPDATE OF content ON agora BEGIN
+                INSERT INTO agora_fts (agora_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO agora_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        if not existed:
+            # Index whatever history predates the FTS table
+            await db.execute("INSERT INTO agora_fts (agora_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+
+    async def archive(
+        self,
+        older_than_days: int = config.AGORA_RETENTION_DAYS,
+        archive_dir: str = config.AGORA_ARCHIVE_DIR,
+    ) -> int:
+        # Moves agora rows older than the retention window into monthly archive
+        # databases (archive_dir/agora-YYYY-MM.sqlite), then reclaims the space.
+        os.makedirs(archive_dir, exist_ok=True)
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        ).strftime("%Y-%m-%d %H:%M:%S")
+        moved = 0
+        async with self._write_db() as db:
+            # Ids grow with time, so walking back from the newest row only
+            # touches the hot rows before it finds the archive boundary
+            async with db.execute(
+                "SELECT id FROM agora WHERE timestamp < ? ORDER BY id DESC LIMIT 1",
+                (cutoff,),
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                # Commit the buffered posts _write_db drained into this transaction
+                await db.commit()
+                return 0
+            max_id = row[0]
+
+            async with db.execute(
+                "SELECT DISTINCT strftime('%Y-%m', timestamp) FROM agora WHERE id <= ? AND timestamp < ?",
+                (max_id, cutoff),
+            ) as cursor:
+                months = [r[0] for r in await cursor.fetchall() if r[0]]
+            # ATTACH is not allowed inside a transaction
+            await db.commit()
+
+            for month in months:
+                path = os.path.join(archive_dir, f"agora-{month}.sqlite")
+                await db.execute("ATTACH DATABASE ? AS archive", (path,))
+                try:
+                    await db.execute("""
+                        CREATE TABLE IF NOT EXISTS archive.agora (
+                            id INTEGER PRIMARY KEY,
+                            agent_id TEXT,
+                            content TEXT,
+                            type TEXT,
+                            timestamp DATETIME,
+                            metadata TEXT
+                        )
+                    """)
+                    # OR IGNORE keeps a rerun after a crash between the two steps safe
+                    cursor = await db.execute(
+                        """
+                        INSERT OR IGNORE INTO archive.agora (id, agent_id, content, type, timestamp, metadata)
+                        SELECT id, agent_id, content, type, timestamp, metadata FROM main.agora
+                        WHERE id <= ? AND timestamp < ? AND strftime('%Y-%m', timestamp) = ?
+                        """,
+                        (max_id, cutoff, month),
+                    )
+                    moved += cursor.rowcount
+                    await db.execute(
+                        "DELETE FROM main.agora WHERE id <= ? AND timestamp < ? AND strftime('%Y-%m', timestamp) = ?",
+                        (max_id, cutoff, month),
+                    )
+                    await db.commit()
+                finally:
+                    await db.execute("DETACH DATABASE archive")
+
+            async with db.execute("PRAGMA auto_vacuum") as cursor:
+                row = await cursor.fetchone()
+            if row is None or row[0] != 2:
+                # One-off conversion of databases created before incremental vacuum
+                await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                await db.execute("VACUUM")
+            else:
+                async with db.execute("PRAGMA incremental_vacuum") as cursor:
+                    await cursor.fetchall()
+        return moved
+
+    async def post_query(self, recipient: str, content: str):
+        # The query is still posted to the feed as a 'user_query' row for history
+        # and monitors; delivery itself goes through the inbox. "all" fans out to
+        # every agent that is active at the time of posting.
+        async with self._write_db() as db:
+            cursor = await db.execute(
+                "INSERT INTO agora (agent_id, content, type) VALUES (?, ?, 'user_query')",
+                (recipient, content),
+            )
+            message_id = cursor.lastrowid
+            if recipient == "all":
+                async with db.execute(
+                    "SELECT agent_id FROM registry WHERE status = 'active'"
+                ) as cursor:
+                    recipients = [row[0] for row in await cursor.fetchall()]
+            else:
+                recipients = [recipient]
+            await db.executemany(
+                "INSERT INTO inbox (message_id, recipient, content) VALUES (?, ?, ?)",
+                [(message_id, r, content) for r in recipients],
+            )
+            await db.commit()
+
+    async def fetch_pending_queries(
+        self, agent_label: str, limit: int = 20
+    ) -> List[OperatorQuery]:
+        queries = []
+        async with self._read_db() as db:
+            async with db.execute(
+                """
+                SELECT id, message_id, recipient, content, created FROM inbox
+                WHERE recipient = ? AND acked_at IS NULL ORDER BY id ASC LIMIT ?
+                """,
+                (agent_label, limit),
+            ) as cursor:
+                async for row in cursor:
+                    queries.append(
+                        OperatorQuery(
+                            id=row[0],
+                            message_id=row[1],
+                            recipient=row[2],
+                            content=row[3],
+                            created=row[4],
+                        )
+                    )
+        return queries
+
+    async def ack_queries(self, agent_label: str, query_ids: Sequence[int]) -> int:
+        if not query_ids:
+            return 0
+        async with self._write_db() as db:
+            cursor = await db.execute(
+                f"""
+                UPDATE inbox SET acked_at = CURRENT_TIMESTAMP
+                WHERE recipient = ? AND acked_at IS NULL AND id IN ({", ".join("?" * len(query_ids))})
+                """,
+                (agent_label, *query_ids),
+            )
+            await db.commit()
+        return cursor.rowcount
+
+    async def get_cursor(self, consumer_id: str) -> Optional[int]:
+        async with self._read_db() as db:
+            async with db.execute(
+                "SELECT last_id FROM cursors WHERE consumer_id = ?", (consumer_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_cursor(self, consumer_id: str, last_id: int):
+        async with self._write_db() as db:
+            await db.execute(
+                """
+                INSERT INTO cursors (consumer_id, last_id, updated) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(consumer_id) DO UPDATE SET last_id = excluded.last_id, updated = excluded.updated
+                """,
+                (consumer_id, last_id),
+            )
+            await db.commit()
+
+    async def _bump_version(self, db: aiosqlite.Connection, name: str):
+        await db.execute(VERSION_BUMP_SQL, (name,))
+
+    async def _cached_read(
+        self, name: str, query: str, record_type, depends_on: Sequence[str] = ()
+    ) -> list:
+        # Reads the version first: if a write lands between the two reads we
+        # cache newer rows under an older version, which just costs a re-read.
+        # Counters only ever grow, so their sum changes whenever any of them does.
+        names = [name, *depends_on]
+        async with self._read_db() as db:
+            async with db.execute(
+                f"SELECT COALESCE(SUM(version), 0) FROM versions WHERE name IN ({', '.join('?' * len(names))})",
+                names,
+            ) as cursor:
+                row = await cursor.fetchone()
+            version = row[0] if row else 0
+            cached = self._cache.get(name)
+            if cached is not None and cached[0] == version:
+                return list(cached[1])
+            async with db.execute(query) as cursor:
+                rows = await cursor.fetchall()
+        records = list(map(record_type._make, rows))
+        self._cache[name] = (version, records)
+        return list(records)
+
     async def update_registry(
         self,
         agent_id: str,
@@ -89,37 +873,81 @@ class Agora:
         total_tokens: int,
         last_context_tokens: int,
     ):
-        async with self._get_db() as db:
+        # For status changes (start/stop); per-tick liveness goes through heartbeat()
+        async with self._write_db() as db:
             await db.execute(
                 """
-                INSERT OR REPLACE INTO registry (agent_id, pid, status, total_tokens, last_context_tokens, last_heartbeat)
+                INSERT INTO registry (agent_id, pid, status, total_tokens, last_context_tokens, last_heartbeat)
                 VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(agent_id) DO UPDATE SET
+                    pid = excluded.pid,
+                    status = excluded.status,
+                    total_tokens = excluded.total_tokens,
+                    last_context_tokens = excluded.last_context_tokens,
+                    last_heartbeat = excluded.last_heartbeat
             """,
                 (agent_id, pid, status, total_tokens, last_context_tokens),
             )
+            await db.execute(
+                HEARTBEAT_UPSERT_SQL,
+                (agent_id, pid, total_tokens, last_context_tokens),
+            )
+            await self._bump_version(db, "registry")
+            await self._bump_version(db, "heartbeats")
             await db.commit()
+        self._heartbeats_written[agent_id] = time.monotonic()
+
+    async def heartbeat(
+        self,
+        agent_id: str,
+        pid: int,
+        total_tokens: int,
+        last_context_tokens: int,
+        force: bool = False,
+    ) -> bool:
+        # Throttled to one write per AGORA_HEARTBEAT_INTERVAL per agent so
+        # liveness doesn't compete with real content for the writer lock.
+        # Returns whether a write was issued.
+        now = time.monotonic()
+        last = self._heartbeats_written.get(agent_id)
+        if (
+            not force
+            and last is not None
+            and now - last < config.AGORA_HEARTBEAT_INTERVAL
+        ):
+            return False
+        self._heartbeats_written[agent_id] = now
+
+        params = (agent_id, pid, total_tokens, last_context_tokens)
+        if self.batch_writes:
+            await self._enqueue(HEARTBEAT_UPSERT_SQL, params)
+            await self._enqueue(VERSION_BUMP_SQL, ("heartbeats",))
+            return True
+        async with self._write_db() as db:
+            await db.execute(HEARTBEAT_UPSERT_SQL, params)
+            await self._bump_version(db, "heartbeats")
+            await db.commit()
+        return True
 
     async def get_registry(self) -> List[AgentRegistry]:
-        registry = []
-        async with self._get_db() as db:
-            async with db.execute(
-                "SELECT agent_id, pid, status, total_tokens, last_context_tokens, last_heartbeat FROM registry"
-            ) as cursor:
-                async for row in cursor:
-                    registry.append(
-                        AgentRegistry(
-                            agent_id=row[0],
-                            pid=row[1],
-                            status=row[2],
-                            total_tokens=row[3],
-                            last_context_tokens=row[4],
-                            last_heartbeat=row[5],
-                        )
-                    )
-        return registry
+        return [record.to_model() for record in await self.get_registry_records()]
+
+    async def get_registry_records(self) -> List[RegistryRecord]:
+        return await self._cached_read(
+            "registry",
+            """
+            SELECT r.agent_id, COALESCE(h.pid, r.pid), r.status,
+                   COALESCE(h.total_tokens, r.total_tokens),
+                   COALESCE(h.last_context_tokens, r.last_context_tokens),
+                   COALESCE(h.last_heartbeat, r.last_heartbeat)
+            FROM registry r LEFT JOIN heartbeats h ON h.agent_id = r.agent_id
+            """,
+            RegistryRecord,
+            depends_on=("heartbeats",),
+        )
 
     async def register_service(self, service: ServiceInfo):
-        async with self._get_db() as db:
+        async with self._write_db() as db:
             await db.execute(
                 """
                 INSERT OR REPLACE INTO services (service_name, vm_ip, agent_id, description, status)
@@ -133,26 +961,18 @@ class Agora:
                     service.status,
                 ),
             )
+            await self._bump_version(db, "services")
             await db.commit()
 
     async def get_services(self) -> List[ServiceInfo]:
-        services = []
-        async with self._get_db() as db:
-            async with db.execute(
-                "SELECT service_name, vm_ip, agent_id, start_time, description, status FROM services"
-            ) as cursor:
-                async for row in cursor:
-                    services.append(
-                        ServiceInfo(
-                            service_name=row[0],
-                            vm_ip=row[1],
-                            agent_id=row[2],
-                            start_time=row[3],
-                            description=row[4],
-                            status=row[5],
-                        )
-                    )
-        return services
+        return [record.to_model() for record in await self.get_services_records()]
+
+    async def get_services_records(self) -> List[ServiceRecord]:
+        return await self._cached_read(
+            "services",
+            "SELECT service_name, vm_ip, agent_id, start_time, description, status FROM services",
+            ServiceRecord,
+        )
 
     async def post(
         self,
@@ -162,15 +982,25 @@ class Agora:
         metadata: Optional[dict] = None,
     ):
         # type 'user_query' is special for interactions
-        async with self._get_db() as db:
+        params = (
+            agent_id,
+            content,
+            msg_type,
+            json.dumps(metadata) if metadata else None,
+        )
+        if self.batch_writes:
+            # Stamp now rather than at flush time so timestamps stay accurate.
+            # Buffered posts are not visible to readers until the next flush.
+            await self._enqueue(
+                "INSERT INTO agora (agent_id, content, type, metadata, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (*params, datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            return
+
+        async with self._write_db() as db:
             await db.execute(
                 "INSERT INTO agora (agent_id, content, type, metadata) VALUES (?, ?, ?, ?)",
-                (
-                    agent_id,
-                    content,
-                    msg_type,
-                    json.dumps(metadata) if metadata else None,
-                ),
+                params,
             )
             await db.commit()
 
@@ -179,7 +1009,18 @@ class Agora:
         limit: int = 50,
         msg_type: Optional[str] = None,
         after_id: Optional[int] = None,
+        up_to_id: Optional[int] = None,
     ) -> List[AgoraMessage]:
+        records = await self.get_recent_records(limit, msg_type, after_id, up_to_id)
+        return [record.to_model() for record in records]
+
+    async def get_recent_records(
+        self,
+        limit: int = 50,
+        msg_type: Optional[str] = None,
+        after_id: Optional[int] = None,
+        up_to_id: Optional[int] = None,
+    ) -> List[AgoraRecord]:
         query = "SELECT id, agent_id, content, type, timestamp, metadata FROM agora WHERE 1=1"
         params = []
         if msg_type:
@@ -188,6 +1029,9 @@ class Agora:
         if after_id:
             query += " AND id > ?"
             params.append(after_id)
+        if up_to_id is not None:
+            query += " AND id <= ?"
+            params.append(up_to_id)
 
         # If we are looking for messages AFTER a specific ID, we want the OLDEST ones first
         # to ensure we don't skip anything in a stream.
@@ -199,9 +1043,93 @@ class Agora:
 
         params.append(limit)
 
-        messages = []
-        async with self._get_db() as db:
+        async with self._read_db() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        messages = list(map(AgoraRecord._make, rows))
+
+        # If we used DESC (no after_id), we should reverse to return chronological order
+        return messages if after_id else messages[::-1]
+
+    async def get_since(
+        self,
+        after_id: int,
+        agent_ids: Optional[Sequence[str]] = None,
+        msg_types: Optional[Sequence[str]] = None,
+        limit: int = 200,
+    ) -> List[AgoraRecord]:
+        # Delta read: the oldest `limit` rows after `after_id`, in id order.
+        # Returns compact records since this is the hot path for agents and
+        # subscriptions; use to_model() where validation is needed.
+        query = "SELECT id, agent_id, content, type, timestamp, metadata FROM agora WHERE id > ?"
+        params: list = [after_id]
+        if agent_ids:
+            query += f" AND agent_id IN ({', '.join('?' * len(agent_ids))})"
+            params.extend(agent_ids)
+        if msg_types:
+            query += f" AND type IN ({', '.join('?' * len(msg_types))})"
+            params.extend(msg_types)
+        query += " ORDER BY id ASC LIMIT ?"
+        params.append(limit)
+
+        async with self._read_db() as db:
             async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        return list(map(AgoraRecord._make, rows))
+
+    async def search(
+        self,
+        query: str,
+        agent_id: Optional[str] = None,
+        msg_type: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[AgoraMessage]:
+        # Every whitespace-separated term must match; terms are quoted so user
+        # input can't trip FTS5 query syntax. `since` is a "YYYY-MM-DD[ HH:MM:SS]" UTC timestamp.
+        terms = query.split()
+        if not terms:
+            return []
+
+        if self.fts_enabled is None:
+            async with self._read_db() as db:
+                async with db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'agora_fts'"
+                ) as cursor:
+                    self.fts_enabled = await cursor.fetchone() is not None
+
+        if self.fts_enabled:
+            sql = """
+                SELECT a.id, a.agent_id, a.content, a.type, a.timestamp, a.metadata
+                FROM agora_fts JOIN agora a ON a.id = agora_fts.rowid
+                WHERE agora_fts MATCH ?
+            """
+            params: list = [" ".join('"' + t.replace('"', '""') + '"' for t in terms)]
+        else:
+            sql = "SELECT a.id, a.agent_id, a.content, a.type, a.timestamp, a.metadata FROM agora a WHERE 1=1"
+            params = []
+            for term in terms:
+                sql += " AND a.content LIKE ?"
+                params.append(f"%{term}%")
+        if agent_id:
+            sql += " AND a.agent_id = ?"
+            params.append(agent_id)
+        if msg_type:
+            sql += " AND a.type = ?"
+            params.append(msg_type)
+        if since:
+            sql += " AND a.timestamp >= ?"
+            params.append(since)
+        sql += (
+            " ORDER BY rank LIMIT ?"
+            if self.fts_enabled
+            else " ORDER BY a.id DESC LIMIT ?"
+        )
+        params.append(limit)
+
+        messages = []
+        async with self._read_db() as db:
+            async with db.execute(sql, params) as cursor:
                 async for row in cursor:
                     messages.append(
                         AgoraMessage(
@@ -213,6 +1141,183 @@ class Agora:
                             metadata=row[5],
                         )
                     )
+        return messages
 
-        # If we used DESC (no after_id), we should reverse to return chronological order
-        return messages if after_id else messages[::-1]
+    async def record_usage(self, usage: TokenUsage):
+        if usage.timestamp:
+            now = datetime.strptime(usage.timestamp, "%Y-%m-%d %H:%M:%S").replace(
+                tzinfo=timezone.utc
+            )
+        else:
+            now = datetime.now(timezone.utc)
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        statements = [
+            (
+                TOKEN_USAGE_INSERT_SQL,
+                (
+                    timestamp,
+                    usage.agent_id,
+                    usage.model,
+                    usage.prompt_tokens,
+                    usage.completion_tokens,
+                    usage.total_tokens,
+                    usage.latency_ms,
+                    usage.cached_tokens,
+                ),
+            )
+        ]
+        for granularity, fmt in ROLLUP_FORMATS.items():
+            statements.append(
+                (
+                    TOKEN_ROLLUP_UPSERT_SQL,
+                    (
+                        granularity,
+                        now.strftime(fmt),
+                        usage.agent_id,
+                        usage.model,
+                        usage.prompt_tokens,
+                        usage.completion_tokens,
+                        usage.total_tokens,
+                        usage.latency_ms,
+                        usage.cached_tokens,
+                    ),
+                )
+            )
+
+        if self.batch_writes:
+            for sql, params in statements:
+                await self._enqueue(sql, params)
+            return
+        async with self._write_db() as db:
+            for sql, params in statements:
+                await db.execute(sql, params)
+            await db.commit()
+
+    async def get_memory(self, agent_id: str) -> Optional[AgentMemory]:
+        async with self._read_db() as db:
+            async with db.execute(
+                "SELECT summary, turns, summarized_turns, updated FROM memories WHERE agent_id = ?",
+                (agent_id,),
+            ) as cursor:
+                row = await cursor.fetchone()
+        if not row:
+            return None
+        return AgentMemory(
+            agent_id=agent_id,
+            summary=row[0] or "",
+            turns=json.loads(row[1]) if row[1] else [],
+            summarized_turns=row[2],
+            updated=row[3],
+        )
+
+    async def save_memory(self, memory: AgentMemory):
+        async with self._write_db() as db:
+            await db.execute(
+                """
+                INSERT INTO memories (agent_id, summary, turns, summarized_turns, updated)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(agent_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    turns = excluded.turns,
+                    summarized_turns = excluded.summarized_turns,
+                    updated = excluded.updated
+                """,
+                (
+                    memory.agent_id,
+                    memory.summary,
+                    json.dumps(memory.turns),
+                    memory.summarized_turns,
+                ),
+            )
+            await db.commit()
+
+    async def get_checkpoint(self, user_id: str) -> Optional[AgentCheckpoint]:
+        async with self._read_db() as db:
+            async with db.execute(
+                """
+                SELECT agent_label, username, avatar_url, persona, last_discord_update,
+                       total_tokens, last_context_tokens, tick_interval, updated
+                FROM checkpoints WHERE user_id = ?
+                """,
+                (user_id,),
+            ) as cursor:
+                row = await cursor.fetchone()
+        if not row:
+            return None
+        return AgentCheckpoint(
+            user_id=user_id,
+            agent_label=row[0],
+            username=row[1],
+            avatar_url=row[2],
+            persona=row[3] or "",
+            last_discord_update=row[4] or 0,
+            total_tokens=row[5] or 0,
+            last_context_tokens=row[6] or 0,
+            tick_interval=row[7],
+            updated=row[8],
+        )
+
+    async def save_checkpoint(self, checkpoint: AgentCheckpoint):
+        params = (
+            checkpoint.user_id,
+            checkpoint.agent_label,
+            checkpoint.username,
+            checkpoint.avatar_url,
+            checkpoint.persona,
+            checkpoint.last_discord_update,
+            checkpoint.total_tokens,
+            checkpoint.last_context_tokens,
+            checkpoint.tick_interval,
+        )
+        if self.batch_writes:
+            await self._enqueue(CHECKPOINT_UPSERT_SQL, params)
+            return
+        async with self._write_db() as db:
+            await db.execute(CHECKPOINT_UPSERT_SQL, params)
+            await db.commit()
+
+    async def get_usage_rollups(
+        self,
+        granularity: str = "minute",
+        since: Optional[datetime] = None,
+        agent_id: Optional[str] = None,
+    ) -> List[UsageRollup]:
+        # Time series per bucket/agent/model, oldest bucket first
+        query = """
+            SELECT bucket, agent_id, model, calls, prompt_tokens, completion_tokens, total_tokens, latency_ms, cached_tokens
+            FROM token_rollups WHERE granularity = ?
+        """
+        params: list = [granularity]
+        if since:
+            query += " AND bucket >= ?"
+            params.append(
+                since.astimezone(timezone.utc).strftime(ROLLUP_FORMATS[granularity])
+            )
+        if agent_id:
+            query += " AND agent_id = ?"
+            params.append(agent_id)
+        query += " ORDER BY bucket ASC"
+
+        async with self._read_db() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        return list(map(UsageRollup._make, rows))
+
+    async def get_usage_by_agent(
+        self, since: datetime, granularity: str = "minute"
+    ) -> List[UsageRollup]:
+        # Per agent/model totals since `since`, heaviest first
+        query = """
+            SELECT NULL, agent_id, model, SUM(calls), SUM(prompt_tokens), SUM(completion_tokens),
+                   SUM(total_tokens), SUM(latency_ms), SUM(cached_tokens)
+            FROM token_rollups WHERE granularity = ? AND bucket >= ?
+            GROUP BY agent_id, model ORDER BY SUM(total_tokens) DESC
+        """
+        params = (
+            granularity,
+            since.astimezone(timezone.utc).strftime(ROLLUP_FORMATS[granularity]),
+        )
+        async with self._read_db() as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        return list(map(UsageRollup._make, rows))
@@ -0,0 +1,33 @@
+import json
+import os
+import time
+from ..utils.config import config
+
+
+class StatusBoard:
+    # One small JSON file per agent, replaced atomically every tick. Monitors read
+    # these for live status without touching the Agora database or its WAL.
+    def __init__(self, status_dir: str = config.AGENT_STATUS_DIR):
+        self.status_dir = status_dir
+        os.makedirs(status_dir, exist_ok=True)
+
+    def write(self, agent_id: str, **fields):
+        data = {"agent_id": agent_id, "updated": time.time(), **fields}
+        path = os.path.join(self.status_dir, f"{agent_id}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def read_all(self) -> dict:
+        statuses = {}
+        for filename in os.listdir(self.status_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.status_dir, filename), "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            statuses[data.get("agent_id", filename[:-5])] = data
+        return statuses
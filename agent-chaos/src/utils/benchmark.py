@@ -0,0 +1,375 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import aiosqlite
+from contextlib import asynccontextmanager
+from rich.console import Console
+from rich.table import Table
+from ..communication.agora import Agora, AgoraMessage, AgoraRecord, ServiceInfo
+
+console = Console()
+
+
+class LegacyAgora(Agora):
+    # Reproduces the original behaviour: a fresh connection (and PRAGMAs) per call
+    @asynccontextmanager
+    async def _fresh_db(self):
+        async with aiosqlite.connect(self.db_path, timeout=30.0) as db:
+            await db.execute("PRAGMA journal_mode=WAL")
+            await db.execute("PRAGMA synchronous=NORMAL")
+            yield db
+
+    def _write_db(self):
+        return self._fresh_db()
+
+    def _read_db(self):
+        return self._fresh_db()
+
+
+async def _seed(agora: Agora, rows: int):
+    await agora.initialize()
+    for i in range(rows):
+        await agora.post(f"chaos-bench-{i % 10}", f"seed message {i}", "message")
+    for i in range(10):
+        await agora.register_service(
+            ServiceInfo(
+                service_name=f"svc-{i}",
+                vm_ip="10.0.0.1",
+                agent_id=f"chaos-bench-{i}",
+                description="benchmark service",
+            )
+        )
+
+
+async def _time_calls(agora: Agora, iterations: int) -> dict:
+    timings = {"post": [], "get_recent": [], "get_services": [], "get_registry": []}
+    calls = {
+        "post": lambda: agora.post("chaos-bench", "benchmark message", "message"),
+        "get_recent": lambda: agora.get_recent(limit=50),
+        "get_services": lambda: agora.get_services(),
+        "get_registry": lambda: agora.get_registry(),
+    }
+    for _ in range(iterations):
+        for name, call in calls.items():
+            start = time.perf_counter()
+            await call()
+            timings[name].append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _summarize(samples: list) -> tuple[float, float]:
+    return statistics.median(samples), statistics.mean(samples)
+
+
+async def run_pool_benchmark(iterations: int = 200, seed_rows: int = 1000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "agora.sqlite")
+
+        legacy = LegacyAgora(db_path)
+        await _seed(legacy, seed_rows)
+        legacy_timings = await _time_calls(legacy, iterations)
+
+        pooled = Agora(db_path)
+        try:
+            pooled_timings = await _time_calls(pooled, iterations)
+        finally:
+            await pooled.close()
+
+    table = Table(
+        title=f"Agora per-call latency ({iterations} iterations, {seed_rows} seed rows)",
+        show_header=True,
+        header_style="bold magenta",
+    )
+    table.add_column("Method", style="cyan")
+    table.add_column("Legacy p50 (ms)", justify="right")
+    table.add_column("Legacy mean (ms)", justify="right")
+    table.add_column("Pooled p50 (ms)", justify="right")
+    table.add_column("Pooled mean (ms)", justify="right")
+    table.add_column("Speedup (p50)", style="green", justify="right")
+
+    for name in legacy_timings:
+        legacy_p50, legacy_mean = _summarize(legacy_timings[name])
+        pooled_p50, pooled_mean = _summarize(pooled_timings[name])
+        table.add_row(
+            name,
+            f"{legacy_p50:.3f}",
+            f"{legacy_mean:.3f}",
+            f"{pooled_p50:.3f}",
+            f"{pooled_mean:.3f}",
+            f"{legacy_p50 / pooled_p50:.1f}x" if pooled_p50 else "-",
+        )
+
+    console.print(table)
+
+
+def _rows_per_sec(decode, rows: list, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(rows)
+    return len(rows) * iterations / (time.perf_counter() - start)
+
+
+async def run_decode_benchmark(rows: int = 50, iterations: int = 2000):
+    sample = [
+        (
+            i,
+            f"chaos-bench-{i % 10}",
+            f"benchmark content {i} " * 8,
+            "message",
+            "2026-01-01 00:00:00",
+            None,
+        )
+        for i in range(rows)
+    ]
+
+    def decode_models(batch):
+        return [
+            AgoraMessage(
+                id=row[0],
+                agent_id=row[1],
+                content=row[2],
+                type=row[3],
+                timestamp=row[4],
+                metadata=row[5],
+            )
+            for row in batch
+        ]
+
+    def decode_records(batch):
+        return list(map(AgoraRecord._make, batch))
+
+    def decode_records_then_models(batch):
+        return [record.to_model() for record in map(AgoraRecord._make, batch)]
+
+    results = [
+        ("pydantic models", _rows_per_sec(decode_models, sample, iterations)),
+        ("records", _rows_per_sec(decode_records, sample, iterations)),
+        (
+            "records + to_model()",
+            _rows_per_sec(decode_records_then_models, sample, iterations),
+        ),
+    ]
+
+    # End to end through SQLite, to show how much of a read decoding accounts for
+    with tempfile.TemporaryDirectory() as tmp:
+        agora = Agora(os.path.join(tmp, "agora.sqlite"))
+        try:
+            await _seed(agora, rows)
+            for name, call in (
+                ("get_recent (models)", lambda: agora.get_recent(limit=rows)),
+                ("get_recent_records", lambda: agora.get_recent_records(limit=rows)),
+            ):
+                db_iterations = max(1, iterations // 10)
+                start = time.perf_counter()
+                for _ in range(db_iterations):
+                    await call()
+                results.append(
+                    (name, rows * db_iterations / (time.perf_counter() - start))
+                )
+        finally:
+            await agora.close()
+
+    table = Table(
+        title=f"Agora row decoding ({rows} rows per call)",
+        show_header=True,
+        header_style="bold magenta",
+    )
+    table.add_column("Path", style="cyan")
+    table.add_column("Rows/sec", justify="right", style="green")
+    for name, rate in results:
+        table.add_row(name, f"{rate:,.0f}")
+
+    console.print(table)
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _simulate_agent(
+    db_path: str,
+    agent_index: int,
+    duration: float,
+    posts_per_tick: int,
+    tick_delay: float,
+    busy_timeout: float,
+    max_retries: int,
+) -> dict:
+    # Mirrors one Agent.run tick against the Agora
+    agora = Agora(db_path, busy_timeout=busy_timeout)
+    label = f"chaos-bench-{agent_index}"
+    await agora.update_registry(label, os.getpid(), "active", 0, 0)
+    stats = {
+        "latencies": {},
+        "busy": 0,
+        "retries": 0,
+        "failures": 0,
+        "ticks": 0,
+        "elapsed": 0.0,
+    }
+
+    async def timed(name: str, call):
+        for attempt in range(max_retries + 1):
+            start = time.perf_counter()
+            try:
+                result = await call()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                stats["busy"] += 1
+                if attempt == max_retries:
+                    stats["failures"] += 1
+                    return None
+                stats["retries"] += 1
+                await asyncio.sleep(0.05 * (2**attempt) + random.random() * 0.05)
+                continue
+            stats["latencies"].setdefault(name, []).append(
+                (time.perf_counter() - start) * 1000
+            )
+            return result
+
+    started = time.perf_counter()
+    try:
+        cursor = await agora.get_cursor(label) or 0
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            await timed(
+                "heartbeat",
+                lambda: agora.heartbeat(label, os.getpid(), 0, 0),
+            )
+            rows = await timed("get_since", lambda: agora.get_since(cursor, limit=200))
+            if rows:
+                cursor = rows[-1].id
+                await timed("set_cursor", lambda: agora.set_cursor(label, cursor))
+            await timed("get_services", lambda: agora.get_services_records())
+            await timed(
+                "fetch_pending_queries", lambda: agora.fetch_pending_queries(label)
+            )
+            for i in range(posts_per_tick):
+                await timed(
+                    "post",
+                    lambda: agora.post(label, f"benchmark post {i}", "thought"),
+                )
+            await timed("flush", lambda: agora.flush())
+            stats["ticks"] += 1
+            if tick_delay:
+                await asyncio.sleep(tick_delay)
+    finally:
+        await agora.close()
+    stats["elapsed"] = time.perf_counter() - started
+    return stats
+
+
+def _contention_worker(db_path: str, agent_index: int, barrier, results, options):
+    # Wait until every process has finished importing so they start together
+    barrier.wait()
+    results.put(asyncio.run(_simulate_agent(db_path, agent_index, **options)))
+
+
+async def run_contention_benchmark(
+    agents: int = 20,
+    duration: float = 20.0,
+    posts_per_tick: int = 6,
+    tick_delay: float = 0.0,
+    busy_timeout: float = 30.0,
+    max_retries: int = 3,
+    db_path: str = "",
+):
+    # Starts N separate processes, each running the agent access pattern against
+    # one shared database, and reports per-method latency and lock contention
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = db_path or os.path.join(tmp, "agora.sqlite")
+        setup = Agora(db_path)
+        try:
+            await _seed(setup, 500)
+        finally:
+            await setup.close()
+
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(agents + 1)
+        results = ctx.Queue()
+        options = {
+            "duration": duration,
+            "posts_per_tick": posts_per_tick,
+            "tick_delay": tick_delay,
+            "busy_timeout": busy_timeout,
+            "max_retries": max_retries,
+        }
+        workers = [
+            ctx.Process(
+                target=_contention_worker,
+                args=(db_path, i, barrier, results, options),
+            )
+            for i in range(agents)
+        ]
+        for worker in workers:
+            worker.start()
+
+        console.print(
+            f"Running {agents} simulated agents for {duration:.0f}s against {db_path}..."
+        )
+        await asyncio.to_thread(barrier.wait, 120)
+        collected = [
+            await asyncio.to_thread(results.get, True, duration + busy_timeout * 4 + 60)
+            for _ in workers
+        ]
+        for worker in workers:
+            worker.join()
+
+    elapsed = max(stats["elapsed"] for stats in collected)
+    latencies: dict = {}
+    for stats in collected:
+        for name, samples in stats["latencies"].items():
+            latencies.setdefault(name, []).extend(samples)
+
+    table = Table(
+        title=f"Agora contention: {agents} processes, {elapsed:.1f}s",
+        show_header=True,
+        header_style="bold magenta",
+    )
+    table.add_column("Method", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Calls/sec", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right", style="yellow")
+    table.add_column("Max (ms)", justify="right", style="red")
+    total_calls = 0
+    for name, samples in latencies.items():
+        total_calls += len(samples)
+        table.add_row(
+            name,
+            f"{len(samples):,}",
+            f"{len(samples) / elapsed:,.1f}",
+            f"{_percentile(samples, 50):.2f}",
+            f"{_percentile(samples, 99):.2f}",
+            f"{max(samples):.2f}",
+        )
+    console.print(table)
+
+    ticks = sum(stats["ticks"] for stats in collected)
+    console.print(
+        f"Throughput: {total_calls / elapsed:,.1f} calls/sec, {ticks / elapsed:,.1f} ticks/sec | "
+        f"busy errors: {sum(s['busy'] for s in collected)}, "
+        f"retries: {sum(s['retries'] for s in collected)}, "
+        f"failed calls: {sum(s['failures'] for s in collected)}"
+    )
+
+
+async def run_benchmark(kind: str = "pool", *args: str):
+    if kind == "pool":
+        await run_pool_benchmark()
+    elif kind == "decode":
+        await run_decode_benchmark()
+    elif kind == "contention":
+        agents = int(args[0]) if len(args) > 0 else 20
+        duration = float(args[1]) if len(args) > 1 else 20.0
+        await run_contention_benchmark(agents, duration)
+    else:
+        console.print(f"Unknown benchmark: {kind}")
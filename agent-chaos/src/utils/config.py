@@ -17,6 +17,89 @@ class Config(BaseModel):
     DISCORD_BOT_TOKEN: str = os.getenv("DISCORD_BOT_TOKEN", "")
     UPDATE_CHANNEL_ID: int = int(os.getenv("UPDATE_CHANNEL_ID", "0"))
     UPDATE_THREAD_ID: int = int(os.getenv("UPDATE_THREAD_ID", "0"))
+    AGORA_READERS: int = int(os.getenv("AGORA_READERS", "4"))
+    AGORA_BATCH_WRITES: bool = (
+        os.getenv("AGORA_BATCH_WRITES", "false").lower() == "true"
+    )
+    AGORA_BATCH_SIZE: int = int(os.getenv("AGORA_BATCH_SIZE", "50"))
+    AGORA_BATCH_INTERVAL: float = float(os.getenv("AGORA_BATCH_INTERVAL", "1.0"))
+    AGORA_NOTIFY_INTERVAL: float = float(os.getenv("AGORA_NOTIFY_INTERVAL", "0.05"))
+    AGORA_HEARTBEAT_INTERVAL: float = float(os.getenv("AGORA_HEARTBEAT_INTERVAL", "60"))
+    AGENT_STATUS_DIR: str = os.getenv("AGENT_STATUS_DIR", "data/state/status")
+    # "process" runs one process per agent; "shared" hosts agents as asyncio
+    # tasks, sharded across AGENT_WORKERS processes
+    AGENT_RUNTIME: str = os.getenv("AGENT_RUNTIME", "process")
+    AGENT_WORKERS: int = int(os.getenv("AGENT_WORKERS", "1"))
+    AGENT_FEED_WINDOW: int = int(os.getenv("AGENT_FEED_WINDOW", "50"))
+    # Agents tick every AGENT_TICK_INTERVAL seconds, stretching towards the max
+    # while idle; queries and mentions wake them early
+    AGENT_TICK_INTERVAL: float = float(os.getenv("AGENT_TICK_INTERVAL", "15"))
+    AGENT_MAX_TICK_INTERVAL: float = float(os.getenv("AGENT_MAX_TICK_INTERVAL", "120"))
+    AGENT_MIN_TICK_INTERVAL: float = float(os.getenv("AGENT_MIN_TICK_INTERVAL", "2"))
+    AGENT_TICK_JITTER: float = float(os.getenv("AGENT_TICK_JITTER", "0.2"))
+    # Wall-clock limit per SSH command, and concurrent commands per VM
+    ACTION_TIMEOUT: float = float(os.getenv("ACTION_TIMEOUT", "120"))
+    ACTION_MAX_PER_VM: int = int(os.getenv("ACTION_MAX_PER_VM", "4"))
+    # Command output kept in memory (head + tail); the full stream spills to a
+    # file under ACTION_SPILL_DIR (empty disables). Long commands post their
+    # latest output every ACTION_PROGRESS_INTERVAL seconds.
+    ACTION_OUTPUT_HEAD_BYTES: int = int(os.getenv("ACTION_OUTPUT_HEAD_BYTES", "8192"))
+    ACTION_OUTPUT_TAIL_BYTES: int = int(os.getenv("ACTION_OUTPUT_TAIL_BYTES", "8192"))
+    ACTION_SPILL_DIR: str = os.getenv("ACTION_SPILL_DIR", "data/state/output")
+    ACTION_PROGRESS_INTERVAL: float = float(os.getenv("ACTION_PROGRESS_INTERVAL", "10"))
+    ACTION_PROGRESS_BYTES: int = int(os.getenv("ACTION_PROGRESS_BYTES", "2048"))
+    # Estimated token budget for the Agora context in each prompt, and the
+    # longest command output kept before it is elided
+    AGENT_CONTEXT_BUDGET: int = int(os.getenv("AGENT_CONTEXT_BUDGET", "6000"))
+    AGENT_MAX_OUTPUT_CHARS: int = int(os.getenv("AGENT_MAX_OUTPUT_CHARS", "2000"))
+    # Older turns are folded into a rolling summary by the fast model (or
+    # MEMORY_MODEL when set); only AGENT_MEMORY_TURNS recent turns are sent verbatim
+    MEMORY_MODEL: str = os.getenv("MEMORY_MODEL", "")
+    AGENT_MEMORY_TURNS: int = int(os.getenv("AGENT_MEMORY_TURNS", "4"))
+    AGENT_MEMORY_BATCH: int = int(os.getenv("AGENT_MEMORY_BATCH", "6"))
+    # Stream completions and act on each response element as soon as it parses;
+    # ask the provider for JSON output instead of stripping code fences
+    AGENT_STREAMING: bool = os.getenv("AGENT_STREAMING", "true").lower() == "true"
+    AGENT_JSON_MODE: bool = os.getenv("AGENT_JSON_MODE", "true").lower() == "true"
+    PROMPT_CACHE_CONTROL: bool = (
+        os.getenv("PROMPT_CACHE_CONTROL", "true").lower() == "true"
+    )
+    AGENT_CHECKPOINT_INTERVAL: float = float(
+        os.getenv("AGENT_CHECKPOINT_INTERVAL", "60")
+    )
+    # Host-wide LLM rate limits shared by every agent process (0 disables a
+    # bucket); calls are charged an estimate up front and settled afterwards
+    LLM_REQUESTS_PER_MIN: float = float(os.getenv("LLM_REQUESTS_PER_MIN", "60"))
+    LLM_TOKENS_PER_MIN: float = float(os.getenv("LLM_TOKENS_PER_MIN", "1000000"))
+    LLM_COMPLETION_ESTIMATE: int = int(os.getenv("LLM_COMPLETION_ESTIMATE", "1000"))
+    LLM_LIMITER_DB: str = os.getenv("LLM_LIMITER_DB", "data/state/ratelimit.sqlite")
+    # "openrouter" talks to LLM_BASE_URL directly; "record" also saves every
+    # call to LLM_CASSETTE_DIR and "replay" serves them back offline
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "openrouter")
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+    LLM_CASSETTE_DIR: str = os.getenv("LLM_CASSETTE_DIR", "data/cassettes")
+    # Local OpenAI-compatible stand-in (python main.py stub)
+    LLM_STUB_PORT: int = int(os.getenv("LLM_STUB_PORT", "8089"))
+    LLM_STUB_LATENCY: float = float(os.getenv("LLM_STUB_LATENCY", "0.5"))
+    LLM_STUB_RESPONSES: str = os.getenv("LLM_STUB_RESPONSES", "")
+    # Token budgets over rolling windows (0 = unlimited). Near a limit agents
+    # trim their context, then tick less often, then pause.
+    AGENT_TOKENS_PER_HOUR: int = int(os.getenv("AGENT_TOKENS_PER_HOUR", "250000"))
+    AGENT_TOKENS_PER_DAY: int = int(os.getenv("AGENT_TOKENS_PER_DAY", "3000000"))
+    GLOBAL_TOKENS_PER_HOUR: int = int(os.getenv("GLOBAL_TOKENS_PER_HOUR", "0"))
+    GLOBAL_TOKENS_PER_DAY: int = int(os.getenv("GLOBAL_TOKENS_PER_DAY", "0"))
+    # Model cascade: idle ticks, persona generation and memory compaction use
+    # FAST_MODEL; operator queries, mentions, action follow-ups and busy ticks
+    # (ROUTER_BUSY_ROWS+ new rows from other agents) use STRONG_MODEL. Invalid
+    # JSON from the fast model is retried once on the strong one.
+    MODEL_CASCADE: bool = os.getenv("MODEL_CASCADE", "true").lower() == "true"
+    FAST_MODEL: str = os.getenv("FAST_MODEL", "google/gemini-2.5-flash-lite")
+    STRONG_MODEL: str = os.getenv(
+        "STRONG_MODEL", os.getenv("GEMINI_MODEL", "google/gemini-3-flash-preview")
+    )
+    ROUTER_BUSY_ROWS: int = int(os.getenv("ROUTER_BUSY_ROWS", "5"))
+    AGORA_RETENTION_DAYS: int = int(os.getenv("AGORA_RETENTION_DAYS", "7"))
+    AGORA_ARCHIVE_DIR: str = os.getenv("AGORA_ARCHIVE_DIR", "data/state/archive")
 
 
 config = Config()
@@ -5,40 +5,31 @@ from rich.console import Console
 from rich.prompt import Prompt
 from rich.panel import Panel
 from rich.syntax import Syntax
+from rich.table import Table
 from ..communication.agora import Agora
 
 console = Console()
 
 
 async def listen_for_responses(agora: Agora, show_internal: bool = False):
-    # Track the last ID we've displayed to the user
-    last_processed_id = 0
+    msg_types = ["operator_response"]
+    if show_internal:
+        msg_types += ["thought", "feeling"]
 
-    # Initialize pointer to current latest message in the whole system
+    # Subscriptions start at the current latest message in the whole system
     # so we don't print the entire history on startup
-    recent = await agora.get_recent(limit=1)
-    if recent and recent[0].id is not None:
-        last_processed_id = recent[0].id
-
-    while True:
-        await asyncio.sleep(1)
-        # Fetch ALL new messages after our last processed ID
-        messages = await agora.get_recent(limit=50, after_id=last_processed_id)
-
-        for msg in messages:
-            if msg.id is not None and msg.id > last_processed_id:
-                if msg.type == "operator_response":
-                    console.print(
-                        f"\n[bold green]>>> Response from {msg.agent_id}:[/bold green]"
-                    )
-                    console.print(Panel(msg.content, border_style="green"))
-                elif show_internal and msg.type in ["thought", "feeling"]:
-                    color = "yellow" if msg.type == "thought" else "red"
-                    console.print(
-                        f"\n[dim {color}]({msg.agent_id} {msg.type}): {msg.content}[/]"
-                    )
-
-                last_processed_id = msg.id
+    async with agora.subscribe(msg_types=msg_types) as feed:
+        async for msg in feed:
+            if msg.type == "operator_response":
+                console.print(
+                    f"\n[bold green]>>> Response from {msg.agent_id}:[/bold green]"
+                )
+                console.print(Panel(msg.content, border_style="green"))
+            else:
+                color = "yellow" if msg.type == "thought" else "red"
+                console.print(
+                    f"\n[dim {color}]({msg.agent_id} {msg.type}): {msg.content}[/]"
+                )
 
 
 async def run_interrogator():
@@ -59,7 +50,7 @@ async def run_interrogator():
     )
     show_internal = show_internal_raw == "y"
 
-    asyncio.create_task(listen_for_responses(agora, show_internal))
+    listener = asyncio.create_task(listen_for_responses(agora, show_internal))
 
     while True:
         # Get active agents from registry
@@ -70,6 +61,7 @@ async def run_interrogator():
             "all",
             "[Logs]",
             "[Profiles]",
+            "[Search]",
             "[Stop All]",
             "[Stop Agent]",
             "[Exit]",
@@ -110,11 +102,38 @@ async def run_interrogator():
                     console.print(Syntax(json.dumps(data[:10], indent=2), "json"))
                     console.print(f"... showing first 10 of {len(data)} messages.")
             continue
+        elif choice == "[Search]":
+            query = await asyncio.to_thread(sync_prompt, "Search for")
+            if not query:
+                continue
+            agent_filter = await asyncio.to_thread(
+                sync_prompt, "Limit to agent (blank for all)", default=""
+            )
+            results = await agora.search(query, agent_id=agent_filter or None)
+            if not results:
+                console.print("[dim]No matches.[/dim]")
+                continue
+            table = Table(
+                title=f"Agora search: {query}",
+                show_header=True,
+                header_style="bold magenta",
+                expand=True,
+            )
+            table.add_column("Timestamp", style="dim")
+            table.add_column("Agent", style="cyan")
+            table.add_column("Type", style="green")
+            table.add_column("Content")
+            for msg in results:
+                content = msg.content
+                if len(content) > 200:
+                    content = content[:197] + "..."
+                table.add_row(str(msg.timestamp), msg.agent_id, msg.type, content)
+            console.print(table)
+            continue
         elif choice == "[Profiles]":
-            await agora.post(
+            await agora.post_query(
                 "all",
                 "Please state your full personality profile and current objectives.",
-                "user_query",
             )
             console.print("[cyan]Requested profiles from all agents.[/cyan]")
             continue
@@ -126,13 +145,20 @@ async def run_interrogator():
         if question:
             if choice == "all":
                 for agent in active_agents:
-                    await agora.post(agent, question, "user_query")
+                    await agora.post_query(agent, question)
             else:
-                await agora.post(str(choice), question, "user_query")
+                await agora.post_query(str(choice), question)
 
             console.print(f"[green]Query sent. Waiting for response...[/green]")
             console.print("-" * 20)
 
+    listener.cancel()
+    try:
+        await listener
+    except asyncio.CancelledError:
+        pass
+    await agora.close()
+
 
 if __name__ == "__main__":
     asyncio.run(run_interrogator())
@@ -0,0 +1,204 @@
+import itertools
+import json
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from .config import config
+
+# Used when LLM_STUB_RESPONSES is not set: a valid agent turn that exercises
+# posting and, when VMs are configured, one harmless command
+DEFAULT_AGENT_RESPONSE = {
+    "thought": "Stub tick {n}: nothing real is thinking here.",
+    "feeling": "calm",
+    "message": "{agent} checking in (stub response {n}).",
+    "actions": [{"vm_ip": "{vm_ip}", "command": "uptime"}],
+}
+
+
+def _estimate(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubResponder:
+    # Canned or templated completions. Templates may use {n} (call number),
+    # {agent}, {vm_ip} and {model}; agent calls are recognised by the
+    # "Identity: You are ..." line in the system prompt.
+    def __init__(self, responses_path: str = config.LLM_STUB_RESPONSES):
+        self.responses: List = []
+        if responses_path:
+            with open(responses_path) as f:
+                self.responses = json.load(f)
+        self._counter = itertools.count(1)
+
+    def complete(self, request: dict) -> str:
+        n = next(self._counter)
+        messages = request.get("messages") or []
+        system = _text(messages[0].get("content")) if messages else ""
+        agent = re.search(r"Identity: You are ([^\s.]+)", system)
+        if self.responses:
+            template = self.responses[(n - 1) % len(self.responses)]
+        elif agent:
+            template = DEFAULT_AGENT_RESPONSE
+        else:
+            # Persona generation, memory summaries and other plain-text calls
+            return f"Stub completion {n} for {request.get('model')}."
+
+        vm_ips = re.search(r"VMs: ([^\n]*)\.", system)
+        vm_ip = vm_ips.group(1).split(",")[0].strip() if vm_ips else ""
+        content = template if isinstance(template, str) else json.dumps(template)
+        for name, value in (
+            ("n", str(n)),
+            ("agent", agent.group(1) if agent else "agent"),
+            ("vm_ip", vm_ip),
+            ("model", str(request.get("model"))),
+        ):
+            content = content.replace("{" + name + "}", value)
+        return content
+
+
+def _text(content) -> str:
+    # Message content is a string, or a list of parts when cache_control is used
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content)
+    return content or ""
+
+
+def _usage(request: dict, content: str) -> dict:
+    prompt = sum(_estimate(_text(m.get("content"))) for m in request["messages"])
+    completion = _estimate(content)
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    responder: StubResponder
+    latency: float
+    chunk_delay: float
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": []})
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        content = self.responder.complete(request)
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = request.get("model", "stub")
+        usage = _usage(request, content)
+        time.sleep(self.latency)
+
+        if not request.get("stream"):
+            self._json(
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                },
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send(choices: list, usage: Optional[dict] = None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": choices,
+            }
+            if usage is not None:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        try:
+            for start in range(0, len(content), 32):
+                send(
+                    [
+                        {
+                            "index": 0,
+                            "delta": {"content": content[start : start + 32]},
+                            "finish_reason": None,
+                        }
+                    ]
+                )
+                time.sleep(self.chunk_delay)
+            send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if (request.get("stream_options") or {}).get("include_usage"):
+                send([], usage)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients hang up mid-stream when a response stops parsing
+            pass
+
+
+def make_stub_server(
+    port: int = config.LLM_STUB_PORT,
+    latency: float = config.LLM_STUB_LATENCY,
+    chunk_delay: float = 0.01,
+    responses_path: str = config.LLM_STUB_RESPONSES,
+    host: str = "127.0.0.1",
+) -> ThreadingHTTPServer:
+    handler = type(
+        "ConfiguredStubHandler",
+        (StubHandler,),
+        {
+            "responder": StubResponder(responses_path),
+            "latency": latency,
+            "chunk_delay": chunk_delay,
+        },
+    )
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def run_llm_stub(port: int = config.LLM_STUB_PORT):
+    server = make_stub_server(port)
+    print(
+        f"Stub LLM server on http://127.0.0.1:{port}/v1 "
+        f"(latency {config.LLM_STUB_LATENCY}s). Point agents at it with "
+        f"LLM_BASE_URL=http://127.0.0.1:{port}/v1"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -45,5 +45,30 @@ class AgentLogger:
         with open(interact_file, "a") as f:
             f.write(json.dumps(log_entry) + "\n")
 
+    def log_route(
+        self,
+        agent_label: str,
+        task: str,
+        tier: str,
+        model: str,
+        reason: str,
+        latency_ms: float,
+        total_tokens: int,
+    ):
+        timestamp = datetime.now().isoformat()
+        log_entry = {
+            "timestamp": timestamp,
+            "agent": agent_label,
+            "task": task,
+            "tier": tier,
+            "model": model,
+            "reason": reason,
+            "latency_ms": round(latency_ms),
+            "total_tokens": total_tokens,
+        }
+        routing_file = os.path.join(self.log_dir, "routing.log")
+        with open(routing_file, "a") as f:
+            f.write(json.dumps(log_entry) + "\n")
+
 
 agent_logger = AgentLogger()
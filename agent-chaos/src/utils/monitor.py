@@ -1,25 +1,109 @@
 import asyncio
+from datetime import datetime, timedelta, timezone
 from rich.console import Console
 from rich.table import Table
 from rich.live import Live
 from rich.layout import Layout
 from rich.panel import Panel
-from ..communication.agora import Agora
+from ..communication.agora import Agora, AgoraSubscription, RegistryRecord
+from ..communication.status import StatusBoard
+from ..agents.budget import budget_level
+from ..utils.config import config
 
 console = Console()
 
 
+def _with_live_status(entry: RegistryRecord, statuses: dict) -> RegistryRecord:
+    # Agents write a status file every tick but only heartbeat the Agora on an
+    # interval, so prefer the file when it is fresher than the database row
+    status = statuses.get(entry.agent_id)
+    if not status or status.get("pid") != entry.pid:
+        return entry
+    updated = datetime.fromtimestamp(status["updated"], timezone.utc)
+    if entry.last_heartbeat:
+        try:
+            db_heartbeat = datetime.strptime(
+                entry.last_heartbeat, "%Y-%m-%d %H:%M:%S"
+            ).replace(tzinfo=timezone.utc)
+            if db_heartbeat >= updated:
+                return entry
+        except ValueError:
+            pass
+    return entry._replace(
+        status=status.get("status", entry.status),
+        total_tokens=status.get("total_tokens", entry.total_tokens),
+        last_context_tokens=status.get(
+            "last_context_tokens", entry.last_context_tokens
+        ),
+        last_heartbeat=updated.strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def _tick_summary(status: dict) -> str:
+    # Current scheduler interval and why the agent last woke up
+    if not status or "tick_interval" not in status:
+        return "-"
+    return f"{status['tick_interval']:.0f}s ({status.get('last_wake_reason') or '-'})"
+
+
+def _budget_summary(status: dict) -> str:
+    # Share of the tightest token limit, as last measured by the agent
+    budget = (status or {}).get("budget")
+    if not budget:
+        return "-"
+    colors = {"ok": "green", "trim": "yellow", "slow": "orange3", "pause": "red"}
+    level = budget["level"]
+    return f"[{colors.get(level, 'white')}]{budget['fraction']:.0%} {level}[/]"
+
+
+def _routing_summary(status: dict) -> str:
+    # Calls routed to each tier, and how many fast answers were escalated
+    routing = (status or {}).get("routing")
+    if not routing:
+        return "-"
+    routes = routing.get("routes", {})
+    summary = f"fast {routes.get('fast', 0)} / strong {routes.get('strong', 0)}"
+    if routing.get("escalations"):
+        summary += f" [yellow]({routing['escalations']} escalated)[/]"
+    return summary
+
+
+def _global_budget_caption(hour_tokens: int, day_tokens: int) -> str:
+    parts = []
+    for used, limit, window in (
+        (hour_tokens, config.GLOBAL_TOKENS_PER_HOUR, "hour"),
+        (day_tokens, config.GLOBAL_TOKENS_PER_DAY, "day"),
+    ):
+        if limit:
+            share = used / limit
+            parts.append(f"{window}: {share:.0%} of {limit:,} ({budget_level(share)})")
+    return " | global budget " + ", ".join(parts) if parts else ""
+
+
 async def run_monitor():
     agora = Agora()
     await agora.initialize()
 
     layout = Layout()
-    layout.split_column(Layout(name="feed", ratio=2), Layout(name="stats", ratio=1))
+    layout.split_column(
+        Layout(name="feed", ratio=2),
+        Layout(name="stats", ratio=1),
+        Layout(name="usage", ratio=1),
+    )
+
+    try:
+        async with agora.subscribe() as feed:
+            await _monitor_loop(agora, layout, feed)
+    finally:
+        await agora.close()
 
+
+async def _monitor_loop(agora: Agora, layout: Layout, feed: AgoraSubscription):
+    status_board = StatusBoard()
     with Live(layout, auto_refresh=False) as live:
         while True:
             # 1. Feed Panel
-            recent = await agora.get_recent(limit=15)
+            recent = await agora.get_recent_records(limit=15)
             feed_table = Table(
                 title="Live Activity Feed",
                 show_header=True,
@@ -53,7 +137,8 @@ async def run_monitor():
             layout["feed"].update(Panel(feed_table))
 
             # 2. Stats Panel
-            registry = await agora.get_registry()
+            registry = await agora.get_registry_records()
+            statuses = status_board.read_all()
             stats_table = Table(
                 title="Agent Health & Token Usage",
                 show_header=True,
@@ -66,8 +151,12 @@ async def run_monitor():
             stats_table.add_column("Last Context (Tokens)", style="yellow")
             stats_table.add_column("Total Tokens", style="magenta")
             stats_table.add_column("Heartbeat", style="dim")
+            stats_table.add_column("Tick", style="dim")
+            stats_table.add_column("Budget")
+            stats_table.add_column("Models", style="dim")
 
             for entry in registry:
+                entry = _with_live_status(entry, statuses)
                 status_color = "green" if entry.status == "active" else "red"
                 stats_table.add_row(
                     entry.agent_id,
@@ -76,12 +165,62 @@ async def run_monitor():
                     f"{entry.last_context_tokens:,}",
                     f"{entry.total_tokens:,}",
                     str(entry.last_heartbeat),
+                    _tick_summary(statuses.get(entry.agent_id)),
+                    _budget_summary(statuses.get(entry.agent_id)),
+                    _routing_summary(statuses.get(entry.agent_id)),
                 )
 
             layout["stats"].update(Panel(stats_table))
 
+            # 3. Token Usage Panel
+            usage = await agora.get_usage_by_agent(
+                datetime.now(timezone.utc) - timedelta(hours=1)
+            )
+            burned = sum(u.total_tokens for u in usage)
+            caption = f"{burned:,} tokens this hour (~{burned / 60:,.0f}/min)"
+            if config.GLOBAL_TOKENS_PER_HOUR or config.GLOBAL_TOKENS_PER_DAY:
+                day_usage = await agora.get_usage_by_agent(
+                    datetime.now(timezone.utc) - timedelta(days=1), "hour"
+                )
+                caption += _global_budget_caption(
+                    burned, sum(u.total_tokens for u in day_usage)
+                )
+            usage_table = Table(
+                title="Token Usage (last 60 min)",
+                caption=caption,
+                show_header=True,
+                header_style="bold yellow",
+                expand=True,
+            )
+            usage_table.add_column("Agent ID", style="cyan")
+            usage_table.add_column("Model", style="dim")
+            usage_table.add_column("Calls", justify="right")
+            usage_table.add_column("Prompt", justify="right")
+            usage_table.add_column("Completion", justify="right")
+            usage_table.add_column("Total", justify="right", style="magenta")
+            usage_table.add_column("Avg Prompt/Call", justify="right", style="yellow")
+            usage_table.add_column("Cached", justify="right", style="green")
+            usage_table.add_column("Avg Latency", justify="right")
+
+            for u in usage:
+                usage_table.add_row(
+                    u.agent_id,
+                    u.model,
+                    f"{u.calls:,}",
+                    f"{u.prompt_tokens:,}",
+                    f"{u.completion_tokens:,}",
+                    f"{u.total_tokens:,}",
+                    f"{u.prompt_tokens // max(1, u.calls):,}",
+                    f"{u.cached_tokens / max(1, u.prompt_tokens):.0%}",
+                    f"{u.latency_ms / max(1, u.calls) / 1000:.1f}s",
+                )
+
+            layout["usage"].update(Panel(usage_table))
+
             live.refresh()
-            await asyncio.sleep(2)
+            # Redraw as soon as anything is posted; otherwise refresh
+            # periodically so heartbeats stay current
+            await feed.get_batch(timeout=5)
 
 
 if __name__ == "__main__":
@@ -57,6 +57,13 @@ async def run_service_monitor():
     agora = Agora()
     await agora.initialize()
 
+    try:
+        await _service_monitor_loop(agora)
+    finally:
+        await agora.close()
+
+
+async def _service_monitor_loop(agora: Agora):
     with Live(auto_refresh=False) as live:
         while True:
             registered = await agora.get_services()